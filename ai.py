@@ -1,7 +1,67 @@
-def ai_summary(texts, max_sent=3):
+import re
+
+import numpy as np
+
+from cache import LRUCache
+
+SUMMARY_TOP_K = 5          # ringkasan hanya dari 5 hit teratas
+SUMMARY_CACHE_SIZE = 256
+DEDUP_THRESHOLD = 0.8      # kalimat dengan cosine > 0.8 dianggap duplikat
+
+SENT_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+
+
+def split_sentences(texts, min_len=30):
+    # texts = content_text (teks polos) → cukup dipecah, jangan dibersihkan lagi
     sentences = []
     for t in texts:
-        sentences += t.split(". ")
-    sentences = [s.strip() for s in sentences if len(s) > 30]
-    sentences.sort(key=len, reverse=True)
-    return ". ".join(sentences[:max_sent]) + "."
+        sentences += [s.strip() for s in SENT_RE.split(t or "")]
+    return [s for s in sentences if len(s) > min_len]
+
+
+# ======================================================
+# SUMMARY (query-focused, memo per (query, versi index))
+# ======================================================
+_memo = LRUCache(SUMMARY_CACHE_SIZE)
+
+
+def ai_summary(q, texts, index, max_sent=3):
+    """Ringkasan ekstraktif dari texts (list atau callable) yang paling mirip dengan q."""
+    key = (" ".join(q.lower().split()), index.version, max_sent)
+
+    def build():
+        loaded = texts() if callable(texts) else texts
+        return _summarize(q, split_sentences(loaded), index.vectorizer, max_sent)
+
+    return _memo.get_or_set(key, build)
+
+
+def _summarize(q, sentences, vectorizer, max_sent):
+    if not sentences or vectorizer is None:
+        return None
+
+    # pakai vocabulary index search → baris sudah ternormalisasi L2
+    vecs = vectorizer.transform(sentences)
+    qvec = vectorizer.transform([q]).toarray()
+    if not qvec.any():
+        # kata query tidak dikenal → bandingkan dengan centroid hit
+        qvec = np.asarray(vecs.mean(axis=0))
+    score = np.asarray(vecs @ qvec.T).ravel()
+
+    picked = []
+    seen = set()
+    for i in np.argsort(-score, kind="stable"):
+        if len(picked) == max_sent:
+            break
+        norm = " ".join(re.findall(r"\w+", sentences[i].lower()))
+        if norm in seen:
+            continue
+        seen.add(norm)
+        if picked:
+            sim = (vecs[picked] @ vecs[i].T).toarray().ravel()
+            if sim.max() > DEDUP_THRESHOLD:
+                continue
+        picked.append(i)
+
+    # urutan asli kalimat supaya ringkasan tetap enak dibaca
+    return " ".join(sentences[i] for i in sorted(picked))
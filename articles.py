@@ -0,0 +1,163 @@
+import html
+import re
+from collections import defaultdict
+from html.parser import HTMLParser
+
+
+SNIPPET_CHARS = 500
+
+TAG_RE = re.compile(r"<[^<]+?>")
+
+# gambar upload yang ditanam editor: ditampilkan lewat thumbnail, bukan <img>
+EMBEDDED_IMAGE_RE = re.compile(r"!\[([^\]]*)\]\((uploads/[^)]+)\)")
+# editor membungkus markdown dengan <div style='...'> untuk pilihan font
+WRAPPER_RE = re.compile(r"^\s*<div style='([^']*)'>(.*)</div>\s*$", re.S)
+
+
+def _placeholders(ids):
+    return ",".join("?" * len(ids))
+
+
+# ======================================================
+# DATA HALAMAN BACA ARTIKEL (jumlah query konstan)
+# ======================================================
+def load_reader_data(conn, article_ids, user):
+    """Like, like saya, komentar dan daftar user untuk artikel yang tampil di halaman."""
+    ids = [int(i) for i in article_ids]
+    data = {
+        "likes": {},
+        "liked": set(),
+        "comments": defaultdict(list),
+        "users": [
+            r[0] for r in conn.execute(
+                "SELECT username FROM users WHERE username != ? ORDER BY username",
+                (user,)
+            ).fetchall()
+        ],
+    }
+    if not ids:
+        return data
+
+    ph = _placeholders(ids)
+
+    data["likes"] = {
+        r[0]: r[1] for r in conn.execute(f"""
+            SELECT article_id, COUNT(*) FROM article_likes
+            WHERE article_id IN ({ph})
+            GROUP BY article_id
+        """, ids).fetchall()
+    }
+
+    data["liked"] = {
+        r[0] for r in conn.execute(f"""
+            SELECT article_id FROM article_likes
+            WHERE username=? AND article_id IN ({ph})
+        """, [user] + ids).fetchall()
+    }
+
+    for r in conn.execute(f"""
+        SELECT article_id, username, comment, created_at FROM article_comments
+        WHERE article_id IN ({ph})
+        ORDER BY article_id, created_at
+    """, ids).fetchall():
+        data["comments"][r[0]].append({
+            "username": r[1],
+            "comment": r[2],
+            "created_at": r[3],
+        })
+
+    return data
+
+
+# ======================================================
+# FIELD TURUNAN (dihitung sekali saat artikel ditulis)
+# ======================================================
+ALLOWED_TAGS = {
+    "p", "br", "hr", "h1", "h2", "h3", "h4", "h5", "h6", "strong", "em", "b", "i",
+    "u", "s", "del", "code", "pre", "blockquote", "ul", "ol", "li", "a", "img",
+    "table", "thead", "tbody", "tr", "th", "td", "div", "span", "sup", "sub",
+}
+VOID_TAGS = {"br", "hr", "img"}   # tanpa tag penutup
+ALLOWED_ATTRS = {"href", "src", "alt", "title", "style", "align"}
+DROP_CONTENT = {"script", "style", "iframe", "object", "embed"}
+SAFE_URL_RE = re.compile(r"^(https?:|mailto:|/|#|[\w./-]+$)", re.I)
+
+
+class _Sanitizer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.out = []
+        self.skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in DROP_CONTENT:
+            self.skip += 1
+            return
+        if self.skip or tag not in ALLOWED_TAGS:
+            return
+        kept = []
+        for name, value in attrs:
+            value = value or ""
+            if name not in ALLOWED_ATTRS:
+                continue
+            if name in ("href", "src") and not SAFE_URL_RE.match(value.strip()):
+                continue
+            if name == "style" and re.search(r"expression|url\(|javascript", value, re.I):
+                continue
+            kept.append(f' {name}="{html.escape(value)}"')
+        self.out.append(f"<{tag}{''.join(kept)}>")
+
+    def handle_startendtag(self, tag, attrs):
+        # <br /> dari nl2br: default HTMLParser juga memanggil handle_endtag → </br>
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in DROP_CONTENT:
+            self.skip = max(self.skip - 1, 0)
+        elif not self.skip and tag in ALLOWED_TAGS and tag not in VOID_TAGS:
+            self.out.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        if not self.skip:
+            self.out.append(html.escape(data, quote=False))
+
+
+def sanitize_html(raw):
+    parser = _Sanitizer()
+    parser.feed(raw)
+    parser.close()
+    return "".join(parser.out)
+
+
+def render_html(content):
+    """Markdown (di dalam div font editor) → HTML yang sudah disanitasi."""
+    import markdown
+
+    content = EMBEDDED_IMAGE_RE.sub("", content or "")
+    wrapper = WRAPPER_RE.match(content)
+    style, body = wrapper.groups() if wrapper else ("", content)
+    body = markdown.markdown(body, extensions=["tables", "fenced_code", "nl2br"])
+    if style:
+        body = f"<div style='{style}'>{body}</div>"
+    return sanitize_html(body)
+
+
+def derive_fields(content):
+    """content_html, content_text, snippet dan word_count untuk satu artikel."""
+    content_html = render_html(content)
+    # teks dari HTML yang sudah disanitasi → isi <script> dll. tidak ikut terindeks;
+    # cukup buang tag, tanda markdown sudah dirender (# _ * di teks itu isi asli)
+    text = html.unescape(TAG_RE.sub(" ", content_html))
+    text = re.sub(r"[ \t]+", " ", text)
+    text = re.sub(r"\s*\n\s*", "\n", text).strip()
+    snippet = text
+    if len(text) > SNIPPET_CHARS:
+        snippet = text[:SNIPPET_CHARS].rsplit(" ", 1)[0] + "…"
+    return {
+        "content_html": content_html,
+        "content_text": text,
+        "snippet": snippet,
+        "word_count": len(text.split()),
+    }
@@ -0,0 +1,78 @@
+import mimetypes
+import os
+
+import streamlit as st
+
+from articles import EMBEDDED_IMAGE_RE, render_html
+from cache import LRUCache
+from storage import original_name
+from thumbs import thumbnail
+
+# blob tidak pernah berubah isinya → metadata aman di-cache tanpa TTL
+_info_cache = LRUCache(maxsize=2048)
+
+
+def human_size(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+def attachment_info(conn, path):
+    """Nama, ukuran dan mime file; dari tabel blobs, fallback ke stat file lama."""
+    def load():
+        row = conn.fetchone("SELECT name, size, mime FROM blobs WHERE path=?", (path,))
+        if row:
+            return {"name": row[0], "size": row[1], "mime": row[2]}
+        name = original_name(path)
+        return {
+            "name": name,
+            "size": os.path.getsize(path),
+            "mime": mimetypes.guess_type(name)[0] or "application/octet-stream",
+        }
+
+    return _info_cache.get_or_set(path, load)
+
+
+def _opener(path):
+    # dipanggil Streamlit hanya saat tombol diklik. Streamlit tetap memuat seluruh
+    # isi file ke memori untuk dikirim (tidak di-stream), jadi baca sekali & tutup
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+
+    return read
+
+
+def show_attachment(conn, path, key, preview=True, width=240):
+    """Kartu lampiran: metadata dulu, isi file baru dimuat saat diunduh."""
+    if not path or not os.path.exists(path):
+        return
+
+    info = attachment_info(conn, path)
+    is_image = info["mime"].startswith("image/")
+
+    if preview and is_image:
+        st.image(thumbnail(path, width), width=width)
+
+    st.download_button(
+        f"{'🖼️' if is_image else '📎'} {info['name']} · {human_size(info['size'])}",
+        _opener(path),
+        file_name=info["name"],
+        mime=info["mime"],
+        key=key,
+        on_click="ignore"
+    )
+
+
+def show_content(article, width=640):
+    """HTML artikel yang sudah dirender saat ditulis + thumbnail gambar upload."""
+    content_html = article["content_html"]
+    if not isinstance(content_html, str):   # baris belum di-backfill
+        content_html = render_html(article["content"])
+    st.html(content_html)
+    for alt, path in EMBEDDED_IMAGE_RE.findall(article["content"] or ""):
+        if os.path.exists(path):
+            st.image(thumbnail(path, width), caption=alt, width=width)
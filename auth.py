@@ -1,17 +1,17 @@
-import bcrypt
 import streamlit as st
 from db import get_db
+from passwords import get_pool, AuthBusy
 
-conn = get_db()
 
-def hash_pw(p): return bcrypt.hashpw(p.encode(), bcrypt.gensalt())
-def check_pw(p,h): return bcrypt.checkpw(p.encode(), h)
+# hash disimpan sebagai teks supaya sama di SQLite & Postgres (hash lama berupa bytes)
+# bcrypt jalan di process pool (passwords.py); AuthBusy kalau antrean penuh
+def hash_pw(p, user=None): return get_pool().hash(p, user)
+def check_pw(p, h, user=None): return get_pool().verify(user, p, h)[0]
 
 def init_admin():
-    c = conn.cursor()
-    c.execute("SELECT * FROM users WHERE username='admin'")
-    if not c.fetchone():
-        c.execute("""
+    conn = get_db()
+    if not conn.fetchone("SELECT 1 FROM users WHERE username='admin'"):
+        conn.execute("""
             INSERT INTO users(username,password,role,name,bio)
             VALUES (?,?,?,?,?)
         """, ("admin", hash_pw("admin123"), "admin",
@@ -19,15 +19,23 @@ def init_admin():
         conn.commit()
 
 def login_ui():
+    conn = get_db()
     st.title("🔐 Login")
     u = st.text_input("Username")
     p = st.text_input("Password", type="password")
 
     if st.button("Login"):
-        c = conn.cursor()
-        c.execute("SELECT password,role FROM users WHERE username=?", (u,))
-        r = c.fetchone()
-        if r and check_pw(p,r[0]):
+        r = conn.fetchone("SELECT password,role FROM users WHERE username=?", (u,))
+        try:
+            ok, new_hash = get_pool().verify(u, p, r[0]) if r else (False, None)
+        except AuthBusy as e:
+            st.warning(f"Server sedang sibuk ({e}), coba lagi sebentar")
+            return
+        if ok:
+            if new_hash:
+                # cost bcrypt berubah → simpan hash baru tanpa user sadar
+                conn.execute("UPDATE users SET password=? WHERE username=?", (new_hash, u))
+                conn.commit()
             st.session_state.login = True
             st.session_state.user = u
             st.session_state.role = r[1]
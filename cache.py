@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+# ======================================================
+# LRU + TTL (dipakai bersama semua session dalam proses)
+# ======================================================
+class LRUCache:
+    def __init__(self, maxsize=256, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and (item[0] is None or item[0] > time.monotonic()):
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        expires = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, fn):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn()
+            self.set(key, value)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+# ======================================================
+# VERSI KORPUS (naik setiap artikel ditambah / dihapus)
+# ======================================================
+_corpus_version = 0
+_version_lock = threading.Lock()
+
+
+def corpus_version():
+    return _corpus_version
+
+
+def bump_corpus_version():
+    global _corpus_version
+    with _version_lock:
+        _corpus_version += 1
+        return _corpus_version
+
+
+# ======================================================
+# CACHE FILE DI DISK (grafik, thumbnail): LRU berdasar mtime
+# ======================================================
+def evict(folder, max_bytes):
+    """Hapus file yang paling lama tidak dipakai sampai total <= max_bytes."""
+    entries = []
+    for name in os.listdir(folder):
+        full = os.path.join(folder, name)
+        st = os.stat(full)
+        entries.append((st.st_mtime, st.st_size, full))
+
+    total = sum(e[1] for e in entries)
+    for _, size, full in sorted(entries):
+        if total <= max_bytes:
+            break
+        os.remove(full)
+        total -= size
@@ -0,0 +1,211 @@
+import hashlib
+import io
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache, evict
+
+CHART_CACHE_DIR = "uploads/cache/charts"
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+COLUMNS_DIR = "uploads/columns"
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "2000"))
+
+# batas upload & preview CSV di editor
+CSV_MAX_BYTES = int(os.getenv("CSV_MAX_BYTES", str(50 * 1024 * 1024)))
+CSV_PREVIEW_ROWS = int(os.getenv("CSV_PREVIEW_ROWS", "20000"))
+CSV_PREVIEW_MAX_BYTES = int(os.getenv("CSV_PREVIEW_MAX_BYTES", str(16 * 1024 * 1024)))
+CSV_CHUNK_ROWS = 2000
+
+preview_cache = LRUCache(maxsize=32)
+
+_render_lock = threading.Lock()
+
+
+# ======================================================
+# GAMBAR GRAFIK (Figure langsung, tanpa state global pyplot)
+# ======================================================
+def draw_chart(ax, x, y, chart_type, color):
+    if chart_type == "Line":
+        ax.plot(x, y, color=color)
+    elif chart_type == "Bar":
+        ax.bar(x, y, color=color)
+    else:
+        ax.fill_between(x, y, color=color, alpha=0.6)
+
+
+def chart_figure(x, y, cfg):
+    from matplotlib.figure import Figure   # matplotlib dimuat saat grafik pertama dirender
+
+    x, y = downsample(np.asarray(x), np.asarray(y))
+    fig = Figure()
+    ax = fig.subplots()
+    draw_chart(ax, x, y, cfg["type"], cfg["color"])
+    ax.set_xlabel(cfg["x"])
+    ax.set_ylabel(cfg["y"])
+    return fig
+
+
+# ======================================================
+# DOWNSAMPLING (Largest-Triangle-Three-Buckets)
+# ======================================================
+def lttb(x, y, n):
+    """Index n titik yang mempertahankan bentuk kurva (x, y numerik)."""
+    length = len(y)
+    if n >= length or n < 3:
+        return np.arange(length)
+
+    idx = np.empty(n, dtype=np.int64)
+    idx[0], idx[-1] = 0, length - 1
+    edges = np.linspace(1, length - 1, n - 1).astype(np.int64)
+
+    a = 0
+    for i in range(n - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else length
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) -
+            (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(area.argmax())
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(x, y, n=CHART_MAX_POINTS):
+    if len(y) <= n:
+        return x, y
+    if not np.issubdtype(y.dtype, np.number):
+        idx = np.linspace(0, len(y) - 1, n).astype(np.int64)
+        return x[idx], y[idx]
+
+    if np.issubdtype(x.dtype, np.number):
+        xs = x.astype(np.float64)
+    elif np.issubdtype(x.dtype, np.datetime64):
+        xs = x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    else:
+        xs = np.arange(len(x), dtype=np.float64)   # kategori → posisi
+    idx = lttb(xs, np.nan_to_num(y.astype(np.float64)), n)
+    return x[idx], y[idx]
+
+
+# ======================================================
+# PENYIMPANAN KOLOM (.npy per kolom, dibaca via mmap)
+# ======================================================
+def columns_dir(csv_path):
+    return os.path.join(COLUMNS_DIR, os.path.splitext(os.path.basename(csv_path))[0])
+
+
+def _typed(series):
+    numeric = pd.to_numeric(series, errors="coerce")
+    if numeric.notna().sum() >= series.notna().sum():
+        return numeric.to_numpy(dtype=np.float64)
+    # string biasa: unicode lebar tetap supaya tetap bisa di-mmap
+    return series.fillna("").astype(str).to_numpy(dtype=str)
+
+
+def store_columns(csv_path, columns):
+    """Simpan kolom yang dipakai grafik sebagai .npy bertipe; return folder-nya."""
+    folder = columns_dir(csv_path)
+    os.makedirs(folder, exist_ok=True)
+    meta_path = os.path.join(folder, "meta.json")
+    meta = {}
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+    missing = [c for c in dict.fromkeys(columns) if c not in meta]
+    if missing:
+        df = pd.read_csv(csv_path, usecols=missing)
+        for col in missing:
+            name = f"{len(meta)}.npy"
+            np.save(os.path.join(folder, name), _typed(df[col]))
+            meta[col] = name
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+    return folder
+
+
+def load_columns(csv_path, columns):
+    folder = store_columns(csv_path, columns)   # CSV lama dikonversi sekali
+    with open(os.path.join(folder, "meta.json")) as f:
+        meta = json.load(f)
+    return [np.load(os.path.join(folder, meta[c]), mmap_mode="r") for c in columns]
+
+
+# ======================================================
+# PREVIEW CSV DI EDITOR (sampel terbatas, dibaca per chunk)
+# ======================================================
+def csv_sample(f, max_rows=CSV_PREVIEW_ROWS, max_bytes=CSV_PREVIEW_MAX_BYTES):
+    """Header + baris awal CSV sampai batas baris/byte; return (df, terpotong)."""
+    f.seek(0)
+    chunks, rows, size = [], 0, 0
+    truncated = False
+    with pd.read_csv(f, chunksize=CSV_CHUNK_ROWS) as reader:
+        for chunk in reader:
+            chunks.append(chunk)
+            rows += len(chunk)
+            size += int(chunk.memory_usage(deep=True).sum())
+            if rows >= max_rows or size >= max_bytes:
+                truncated = True
+                break
+    f.seek(0)
+
+    if not chunks:
+        return pd.DataFrame(), False
+    # dtype per chunk bisa beda (mis. int vs float); samakan dari gabungannya
+    df = pd.concat(chunks, ignore_index=True).head(max_rows)
+    return df.infer_objects(), truncated
+
+
+def preview_png(key, x, y, cfg):
+    """PNG preview (bytes), di-cache per file + konfigurasi grafik."""
+    def render():
+        buf = io.BytesIO()
+        chart_figure(x, y, cfg).savefig(buf, format="png", dpi=100, bbox_inches="tight")
+        return buf.getvalue()
+
+    return preview_cache.get_or_set(
+        (key, cfg["x"], cfg["y"], cfg["type"], cfg["color"]), render
+    )
+
+
+# ======================================================
+# CACHE PNG DI DISK
+# ======================================================
+def chart_key(cfg):
+    st = os.stat(cfg["csv"])
+    raw = json.dumps(
+        [cfg["csv"], cfg["x"], cfg["y"], cfg["type"], cfg["color"],
+         st.st_size, st.st_mtime_ns]
+    )
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def render_chart(cfg):
+    """Path PNG grafik untuk cfg; dirender sekali lalu diambil dari cache."""
+    if not cfg or not cfg.get("csv") or not os.path.exists(cfg["csv"]):
+        return None
+
+    path = os.path.join(CHART_CACHE_DIR, f"{chart_key(cfg)}.png")
+    if os.path.exists(path):
+        os.utime(path)   # tandai baru dipakai untuk eviction LRU
+        return path
+
+    with _render_lock:
+        if os.path.exists(path):
+            return path
+        os.makedirs(CHART_CACHE_DIR, exist_ok=True)
+        x, y = load_columns(cfg["csv"], [cfg["x"], cfg["y"]])
+        fig = chart_figure(x, y, cfg)
+        tmp = f"{path}.tmp"
+        fig.savefig(tmp, format="png", dpi=100, bbox_inches="tight")
+        os.replace(tmp, path)
+        evict(CHART_CACHE_DIR, CHART_CACHE_MAX_BYTES)
+    return path
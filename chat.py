@@ -1,28 +1,162 @@
 import os
-import pandas as pd
+import time
 import streamlit as st
-from streamlit_autorefresh import st_autorefresh
 from datetime import datetime
 from db import get_db
+from cache import LRUCache
+import notify
 
 conn = get_db()
+notify.start(conn)
+
+UNREAD_TTL = 2.0   # detik; dibagi semua session & rerun dalam proses
+CHAT_WINDOW = 50   # pesan terakhir yang dimuat saat room dibuka
+MAX_ID = 2**63 - 1
+
+_unread_cache = LRUCache(maxsize=1024, ttl=UNREAD_TTL)
 
 # =====================================================
-# TOTAL UNREAD (UNTUK SIDEBAR)
+# UNREAD PER PENGIRIM (SIDEBAR + ROOM LIST)
 # =====================================================
+def unread_counts(user):
+    """{sender: jumlah pesan belum dibaca} dalam satu query GROUP BY."""
+    def load():
+        rows = conn.execute("""
+            SELECT sender, COUNT(*) FROM chat
+            WHERE receiver=? AND is_read=0
+            GROUP BY sender
+        """, (user,)).fetchall()
+        return {r[0]: r[1] for r in rows}
+
+    return _unread_cache.get_or_set(user, load)
+
+
 def unread_count(user):
-    return conn.execute("""
-        SELECT COUNT(*) FROM chat
-        WHERE receiver=? AND is_read=0
-    """, (user,)).fetchone()[0]
+    return sum(unread_counts(user).values())
+
+
+def invalidate_unread(user):
+    _unread_cache.discard(user)
+
+
+def on_chat_changed(sender, receiver):
+    invalidate_unread(receiver)
+    notify.bump(sender, receiver)
+
+
+# =====================================================
+# REFRESH HANYA KALAU ADA PERUBAHAN
+# =====================================================
+def watch_changes(user):
+    """Fragment kecil yang cek token perubahan; rerun app hanya kalau berubah."""
+    now = time.time()
+    state = st.session_state.setdefault("chat_watch", {"since": now})
+    state["token"] = notify.change_token(user)
+    if not state.pop("tier_rerun", False):
+        # rerun penuh karena aksi user / pesan baru → kembali polling cepat
+        state["since"] = now
+    interval = notify.poll_interval(now - state["since"])
+
+    @st.fragment(run_every=interval)
+    def probe():
+        if notify.change_token(user) != state["token"]:
+            st.rerun()
+        if notify.poll_interval(time.time() - state["since"]) != interval:
+            # idle makin lama → pasang interval yang lebih jarang
+            state["tier_rerun"] = True
+            st.rerun()
+
+    probe()
+
+
+# =====================================================
+# PESAN ROOM (KEYSET PAGINATION PADA id)
+# =====================================================
+def fetch_before(user, target, before_id=MAX_ID, limit=CHAT_WINDOW):
+    """limit pesan terakhir dengan id < before_id, urut naik."""
+    # dua arah di-query terpisah supaya masing-masing range index + LIMIT
+    rows = conn.execute("""
+        SELECT * FROM (
+            SELECT * FROM (
+                SELECT * FROM chat WHERE sender=? AND receiver=? AND id < ?
+                ORDER BY id DESC LIMIT ?
+            ) AS a
+            UNION ALL
+            SELECT * FROM (
+                SELECT * FROM chat WHERE sender=? AND receiver=? AND id < ?
+                ORDER BY id DESC LIMIT ?
+            ) AS b
+        ) AS m
+        ORDER BY id DESC LIMIT ?
+    """, (user, target, before_id, limit,
+          target, user, before_id, limit, limit)).fetchall()
+    return [dict(r) for r in reversed(rows)]
+
+
+def fetch_after(user, target, after_id):
+    rows = conn.execute("""
+        SELECT * FROM chat
+        WHERE ((sender=? AND receiver=?) OR (sender=? AND receiver=?))
+          AND id > ?
+        ORDER BY id
+    """, (user, target, target, user, after_id)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def fetch_read_ids(user, target, from_id):
+    rows = conn.execute("""
+        SELECT id FROM chat
+        WHERE sender=? AND receiver=? AND id >= ? AND is_read=1
+    """, (user, target, from_id)).fetchall()
+    return {r[0] for r in rows}
+
+
+def sync_buffer(user, target):
+    """Buffer pesan di session: load awal, lalu hanya delta id > terakhir."""
+    buf = st.session_state.get("chat_buf")
+
+    if not buf or buf["target"] != target:
+        msgs = fetch_before(user, target)
+        buf = {
+            "target": target,
+            "msgs": msgs,
+            "has_older": len(msgs) == CHAT_WINDOW,
+        }
+        st.session_state.chat_buf = buf
+        return buf
+
+    last_id = buf["msgs"][-1]["id"] if buf["msgs"] else 0
+    buf["msgs"] += fetch_after(user, target, last_id)
+
+    # read receipt: cek ulang pesan saya yang belum terbaca saja
+    pending = [m for m in buf["msgs"] if m["sender"] == user and not m["is_read"]]
+    if pending:
+        read = fetch_read_ids(user, target, pending[0]["id"])
+        for m in pending:
+            if m["id"] in read:
+                m["is_read"] = 1
+
+    return buf
+
+
+def load_older(user, target):
+    buf = st.session_state.chat_buf
+    older = fetch_before(user, target, buf["msgs"][0]["id"])
+    buf["msgs"] = older + buf["msgs"]
+    buf["has_older"] = len(older) == CHAT_WINDOW
 
 
 # =====================================================
 # CHAT UI (ROOM + BUBBLE STYLE)
 # =====================================================
 def chat_ui(user):
-    # auto refresh tiap 3 detik
-    st_autorefresh(interval=3000, key="chat_refresh")
+    # dependensi berat hanya saat halaman chat dibuka (sidebar cukup unread_count)
+    import pandas as pd
+    from storage import store
+    from attachments import show_attachment
+    from thumbs import thumbnail
+
+    watch_changes(user)
 
     # ================= CSS =================
     st.markdown("""
@@ -104,30 +238,29 @@ def chat_ui(user):
     with col_left:
         st.subheader("💬 Chats")
 
-        users = pd.read_sql("""
+        users = conn.read_df("""
             SELECT username, avatar
             FROM users
             WHERE username != ?
             ORDER BY username
-        """, conn, params=(user,))
+        """, (user,))
 
         if "chat_target" not in st.session_state:
             st.session_state.chat_target = None
 
+        unread = unread_counts(user)
+
         for _, row in users.iterrows():
             u = row["username"]
             avatar = row["avatar"]
 
-            badge = conn.execute("""
-                SELECT COUNT(*) FROM chat
-                WHERE receiver=? AND sender=? AND is_read=0
-            """, (user, u)).fetchone()[0]
+            badge = unread.get(u, 0)
 
             colA, colB = st.columns([1, 5])
 
             with colA:
-                if avatar and os.path.exists(avatar):
-                    st.image(avatar, width=40)
+                if pd.notna(avatar) and avatar and os.path.exists(avatar):
+                    st.image(thumbnail(avatar, 40), width=40)
                 else:
                     st.image("https://via.placeholder.com/40", width=40)
 
@@ -144,6 +277,7 @@ def chat_ui(user):
                         WHERE sender=? AND receiver=?
                     """, (u, user))
                     conn.commit()
+                    on_chat_changed(u, user)
 
     # ================= RIGHT: CHAT ROOM =================
     with col_right:
@@ -155,16 +289,16 @@ def chat_ui(user):
 
         st.subheader(f"💬 Chat dengan {target}")
 
-        msgs = pd.read_sql("""
-            SELECT * FROM chat
-            WHERE (sender=? AND receiver=?)
-               OR (sender=? AND receiver=?)
-            ORDER BY created_at
-        """, conn, params=(user, target, target, user))
+        buf = sync_buffer(user, target)
+
+        if buf["has_older"]:
+            if st.button("⬆️ Muat pesan lama", key="chat_older"):
+                load_older(user, target)
+                st.rerun()
 
         st.markdown("<div class='chat-container'>", unsafe_allow_html=True)
 
-        for _, m in msgs.iterrows():
+        for m in buf["msgs"]:
             is_me = m["sender"] == user
             cls = "me" if is_me else "other"
 
@@ -178,34 +312,7 @@ def chat_ui(user):
             )
 
             # ===== ATTACHMENT =====
-            # ===== ATTACHMENT =====
-            if m["attachment"] and os.path.exists(m["attachment"]):
-                ext = m["attachment"].lower()
-
-                # 🖼️ IMAGE PREVIEW + DOWNLOAD
-                if ext.endswith((".png", ".jpg", ".jpeg")):
-                    st.image(m["attachment"], width=240)
-
-                    with open(m["attachment"], "rb") as f:
-                        st.download_button(
-                            "⬇️ Download Image",
-                            f,
-                            file_name=os.path.basename(m["attachment"]),
-                            mime="image/png",
-                            key=f"img_{m['id']}"
-                        )
-
-                # 📄 PDF / FILE DOWNLOAD
-                else:
-                    with open(m["attachment"], "rb") as f:
-                        st.download_button(
-                            "📎 Download File",
-                            f,
-                            file_name=os.path.basename(m["attachment"]),
-                            mime="application/pdf",
-                            key=f"file_{m['id']}"
-                        )
-
+            show_attachment(conn, m["attachment"], key=f"att_{m['id']}")
 
             # ===== READ RECEIPT =====
             if is_me:
@@ -237,10 +344,7 @@ def chat_ui(user):
             attach = None
 
             if file:
-                os.makedirs("uploads/chat", exist_ok=True)
-                attach = f"uploads/chat/{datetime.now().timestamp()}_{file.name}"
-                with open(attach, "wb") as f:
-                    f.write(file.getbuffer())
+                attach = store(conn, file, file.name)
 
             conn.execute("""
                 INSERT INTO chat
@@ -254,5 +358,6 @@ def chat_ui(user):
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             ))
             conn.commit()
+            on_chat_changed(user, target)
 
             st.rerun()
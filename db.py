@@ -1,35 +1,443 @@
+import csv
+import functools
+import io
 import os
 import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+
 import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+
+DB_PATH = os.getenv("DB_PATH", "knowledgebase.db")
+
+# ================= SQLITE TUNING =================
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "1") == "1"
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))   # negatif = KiB
+SQLITE_BUSY_TIMEOUT = float(os.getenv("SQLITE_BUSY_TIMEOUT", "5"))
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+SQLITE_MAINTENANCE_EVERY = 600   # detik antar PRAGMA optimize + checkpoint
+
 
-DB_PATH = "knowledgebase.db"
+def connect_sqlite(path=DB_PATH, tuned=SQLITE_TUNED):
+    if not tuned:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    conn = sqlite3.connect(
+        path,
+        timeout=SQLITE_BUSY_TIMEOUT,
+        check_same_thread=False,
+        cached_statements=SQLITE_STATEMENT_CACHE
+    )
+    conn.row_factory = sqlite3.Row
+    # WAL: pembaca tidak memblokir penulis (dan sebaliknya)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    conn.execute(f"PRAGMA busy_timeout={int(SQLITE_BUSY_TIMEOUT * 1000)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def maintain_sqlite(conn):
+    conn.execute("PRAGMA optimize")
+    conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
 
 
 # ======================================================
-# CONNECTION
+# CONNECTION MANAGER (pool per proses)
 # ======================================================
-def get_db():
-    database_url = os.getenv("DATABASE_URL")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+HEALTH_CHECK_AFTER = 30   # detik idle sebelum koneksi dicek ulang
 
-    # ================= POSTGRES =================
-    if database_url and database_url.startswith("postgres"):
-        try:
-            conn = psycopg2.connect(
-                database_url,
-                sslmode="require",
-                connect_timeout=10
-            )
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionManager:
+    """
+    Satu koneksi per thread (thread script Streamlit), diambil dari pool
+    terbatas dan dikembalikan otomatis saat thread-nya selesai.
+    """
+
+    def __init__(self, size=POOL_SIZE, timeout=POOL_TIMEOUT):
+        self.size = size
+        self.timeout = timeout
+        self.cond = threading.Condition()
+        self.backend = None
+        self.pg_pool = None
+        self.idle = []            # koneksi sqlite yang menganggur
+        self.bound = {}           # thread -> koneksi
+        self.last_used = {}       # id(koneksi) -> waktu terakhir dipakai
+        self.in_use = 0
+        self.maintained_at = time.monotonic()
+        self.metrics = {
+            "checkouts": 0,
+            "opened": 0,
+            "reaped": 0,
+            "rolled_back": 0,
+            "unhealthy": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "max_wait": 0.0,
+        }
+
+    # ---------- init sekali per proses ----------
+    def init(self):
+        database_url = os.getenv("DATABASE_URL")
+
+        # ================= POSTGRES =================
+        if database_url and database_url.startswith("postgres"):
+            try:
+                self.pg_pool = psycopg2.pool.ThreadedConnectionPool(
+                    1, self.size,
+                    database_url,
+                    sslmode="require",
+                    connect_timeout=10
+                )
+                self.backend = "postgres"
+                self._migrate()
+                return
+            except Exception as e:
+                print("POSTGRES FAILED, fallback ke SQLITE:", e)
+                self.pg_pool = None
+
+        # ================= SQLITE =================
+        self.backend = "sqlite"
+        self._migrate()
+
+    def _migrate(self):
+        self.in_use += 1
+        conn = self._open()
+        migrate(conn, self.backend)
+        self._giveback(conn)
+
+    # ---------- koneksi fisik (dipanggil TANPA self.cond) ----------
+    def _open(self):
+        """Koneksi dari pool/idle atau koneksi baru; slot in_use sudah dipesan."""
+        if self.backend == "postgres":
+            conn = self.pg_pool.getconn()   # pool psycopg2 punya lock sendiri
             conn.autocommit = True   # penting supaya tidak lupa commit
-            init_db_postgres(conn)
-            return conn
+        else:
+            with self.cond:
+                conn = self.idle.pop() if self.idle else None
+            if conn is not None:
+                return conn
+            conn = connect_sqlite()
+        with self.cond:
+            if id(conn) not in self.last_used:
+                self.metrics["opened"] += 1
+                self.last_used[id(conn)] = time.monotonic()
+        return conn
+
+    def _in_transaction(self, conn):
+        if self.backend == "postgres":
+            status = conn.get_transaction_status()
+            return status != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+        return conn.in_transaction
+
+    def _discard(self, conn):
+        with self.cond:
+            self.last_used.pop(id(conn), None)
+        try:
+            if self.backend == "postgres":
+                self.pg_pool.putconn(conn, close=True)
+            else:
+                conn.close()
         except Exception as e:
-            print("POSTGRES FAILED, fallback ke SQLITE:", e)
+            print("DB koneksi rusak gagal ditutup:", e)
 
-    # ================= SQLITE =================
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    init_db_sqlite(conn)
-    return conn
+    def _giveback(self, conn):
+        """Kembalikan koneksi ke pool lalu lepas slot in_use-nya."""
+        rolled_back = False
+        try:
+            # write yang gagal sebelum commit jangan ikut ke pemakai berikutnya
+            # (di SQLite transaksi terbuka = write lock tertahan untuk semua koneksi)
+            if self._in_transaction(conn):
+                conn.rollback()
+                rolled_back = True
+            broken = False
+        except Exception:
+            broken = True
+
+        if broken:
+            self._discard(conn)
+        elif self.backend == "postgres":
+            self.pg_pool.putconn(conn)
+        with self.cond:
+            if not broken:
+                self.last_used[id(conn)] = time.monotonic()
+                if self.backend == "sqlite":
+                    self.idle.append(conn)
+            self.metrics["rolled_back"] += rolled_back
+            self.in_use -= 1
+            self.cond.notify()
+
+    def _healthy(self, conn):
+        with self.cond:
+            idle_for = time.monotonic() - self.last_used.get(id(conn), 0)
+        if idle_for < HEALTH_CHECK_AFTER:
+            return True
+        try:
+            if getattr(conn, "closed", 0):
+                return False
+            conn.cursor().execute("SELECT 1")
+            return True
+        except Exception:
+            return False
+
+    def _collect_dead(self):
+        # (di bawah self.cond) thread script yang sudah selesai → koneksinya dikembalikan
+        dead = [t for t in self.bound if not t.is_alive()]
+        self.metrics["reaped"] += len(dead)
+        return [self.bound.pop(t) for t in dead]
+
+    # ---------- API ----------
+    def connection(self):
+        """
+        Slot dipesan di bawah lock; connect, health check dan rollback
+        koneksi thread mati jalan di luar lock supaya tidak saling tunggu.
+        """
+        thread = threading.current_thread()
+        started = time.monotonic()
+        waited = False
+        while True:
+            with self.cond:
+                conn = self.bound.get(thread)
+                if conn is not None:
+                    return conn
+                dead = self._collect_dead()
+                if not dead:
+                    if self.in_use < self.size:
+                        self.in_use += 1
+                        wait = time.monotonic() - started
+                        self.metrics["wait_time"] += wait
+                        self.metrics["max_wait"] = max(self.metrics["max_wait"], wait)
+                        self.metrics["checkouts"] += 1
+                        break
+                    if time.monotonic() - started > self.timeout:
+                        raise PoolTimeout(f"tidak ada koneksi DB bebas setelah {self.timeout}s")
+                    if not waited:
+                        waited = True
+                        self.metrics["waits"] += 1
+                    self.cond.wait(0.05)
+                    continue
+            for c in dead:
+                self._giveback(c)
+
+        try:
+            conn = self._open()
+            if not self._healthy(conn):
+                with self.cond:
+                    self.metrics["unhealthy"] += 1
+                self._discard(conn)
+                conn = self._open()
+        except BaseException:
+            with self.cond:
+                self.in_use -= 1
+                self.cond.notify()
+            raise
+
+        with self.cond:
+            self.bound[thread] = conn
+            maintain = (
+                self.backend == "sqlite" and SQLITE_TUNED and
+                time.monotonic() - self.maintained_at > SQLITE_MAINTENANCE_EVERY
+            )
+            if maintain:
+                self.maintained_at = time.monotonic()
+
+        if maintain:
+            try:
+                maintain_sqlite(conn)
+            except sqlite3.OperationalError as e:
+                print("SQLITE maintenance dilewati:", e)
+        return conn
+
+    def release(self):
+        with self.cond:
+            conn = self.bound.pop(threading.current_thread(), None)
+        if conn is not None:
+            self._giveback(conn)
+
+    def stats(self):
+        with self.cond:
+            return dict(self.metrics, in_use=self.in_use, size=self.size,
+                        backend=self.backend)
+
+
+# ======================================================
+# QUERY LAYER (SQL ditulis dengan placeholder "?" untuk kedua backend)
+# ======================================================
+@functools.lru_cache(maxsize=1024)
+def to_pyformat(sql, has_params=True):
+    """'?' → '%s' untuk psycopg2; '%' literal di-escape kalau ada parameter."""
+    out = []
+    in_string = False
+    for ch in sql:
+        if ch == "'":
+            in_string = not in_string
+        if ch == "?" and not in_string:
+            out.append("%s")
+        elif ch == "%" and has_params:
+            out.append("%%")
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+class Database:
+    """Pengganti objek koneksi: setiap panggilan memakai koneksi milik thread ini."""
+
+    def __init__(self, manager):
+        self.manager = manager
+        self.backend = manager.backend
+
+    @property
+    def raw(self):
+        return self.manager.connection()
+
+    def _native(self, sql, params):
+        if self.backend == "postgres":
+            return to_pyformat(sql, bool(params))
+        return sql
+
+    # ---------- API ----------
+    def execute(self, sql, params=()):
+        conn = self.raw
+        if self.backend == "postgres":
+            cur = conn.cursor(cursor_factory=psycopg2.extras.DictCursor)
+            # tanpa parameter psycopg2 tidak menginterpolasi → '%' jangan di-escape
+            cur.execute(self._native(sql, params), tuple(params) if params else None)
+            return cur
+        return conn.execute(sql, params)
+
+    def executemany(self, sql, seq):
+        conn = self.raw
+        if self.backend == "postgres":
+            cur = conn.cursor()
+            psycopg2.extras.execute_batch(cur, self._native(sql, True), seq, page_size=500)
+            return cur
+        return conn.executemany(sql, seq)
+
+    def fetchone(self, sql, params=()):
+        return self.execute(sql, params).fetchone()
+
+    def fetchall(self, sql, params=()):
+        return self.execute(sql, params).fetchall()
+
+    def insert(self, sql, params=()):
+        """INSERT lalu kembalikan id baris baru di kedua backend."""
+        if self.backend == "postgres":
+            return self.execute(f"{sql.rstrip()} RETURNING id", params).fetchone()[0]
+        return self.execute(sql, params).lastrowid
+
+    def iter_rows(self, sql, params=(), chunk=1000):
+        """Baca besar tanpa memuat semua baris: server-side cursor di Postgres."""
+        conn = self.raw
+        if self.backend != "postgres":
+            cur = conn.execute(sql, params)
+            try:
+                while True:
+                    rows = cur.fetchmany(chunk)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cur.close()
+            return
+
+        # Cursor WITH HOLD di bawah autocommit dimaterialisasi penuh saat
+        # DECLARE; cursor biasa di dalam transaksi eksplisit benar-benar
+        # streaming per chunk.
+        conn.autocommit = False
+        ok = False
+        try:
+            with conn.cursor(
+                name=f"iter_{uuid.uuid4().hex}",
+                cursor_factory=psycopg2.extras.DictCursor
+            ) as cur:
+                cur.itersize = chunk
+                cur.execute(self._native(sql, params), tuple(params) if params else None)
+                while True:
+                    rows = cur.fetchmany(chunk)
+                    if not rows:
+                        break
+                    yield from rows
+            ok = True
+        finally:
+            if ok:
+                conn.commit()
+            else:
+                conn.rollback()
+            conn.autocommit = True
+
+    def read_df(self, sql, params=()):
+        import pandas as pd
+
+        cur = self.execute(sql, params)
+        columns = [d[0] for d in cur.description]
+        return pd.DataFrame.from_records(
+            [tuple(r) for r in cur.fetchall()],
+            columns=columns
+        )
+
+    def copy_rows(self, table, columns, rows):
+        """Bulk insert: COPY FROM STDIN di Postgres, executemany di SQLite."""
+        if self.backend == "postgres":
+            buf = io.StringIO()
+            csv.writer(buf).writerows(rows)
+            buf.seek(0)
+            self.raw.cursor().copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+                buf
+            )
+            return
+        self.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' * len(columns))})",
+            rows
+        )
+
+    def cursor(self):
+        return self.raw.cursor()
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.manager.release()
+
+
+_db = None
+_db_lock = threading.Lock()
+
+
+def get_db():
+    """Database proses ini; schema di-init hanya pada panggilan pertama."""
+    global _db
+    with _db_lock:
+        if _db is None:
+            manager = ConnectionManager()
+            manager.init()
+            _db = Database(manager)
+        return _db
+
+
+def is_postgres(conn):
+    return getattr(conn, "backend", None) == "postgres"
 
 # ======================================================
 # INIT SQLITE
@@ -91,7 +499,56 @@ def init_db_sqlite(conn):
     )
     """)
 
-    conn.commit()
+
+def init_fts_sqlite(conn):
+    cur = conn.cursor()
+
+    exists = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='articles_fts'"
+    ).fetchone()
+
+    try:
+        cur.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            title,
+            content,
+            content='articles',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+    except sqlite3.OperationalError as e:
+        # build sqlite tanpa FTS5 → search pakai TF-IDF
+        print("FTS5 tidak tersedia:", e)
+        return
+
+    # trigger supaya index selalu sinkron dengan tabel articles
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO articles_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """)
+
+    # artikel lama yang sudah ada sebelum FTS dibuat
+    if not exists:
+        cur.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
 
 
 # ======================================================
@@ -154,38 +611,473 @@ def init_db_postgres(conn):
     )
     """)
 
-    conn.commit()
+
+def init_fts_postgres(conn):
+    cur = conn.cursor()
+
+    # full-text search: kolom tsvector + GIN index
+    cur.execute("""
+    ALTER TABLE articles ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content, '')), 'B')
+    ) STORED
+    """)
+
+    cur.execute("""
+    CREATE INDEX IF NOT EXISTS idx_articles_search
+    ON articles USING GIN (search_vector)
+    """)
+
+
+def init_chat_notify_postgres(conn):
+    cur = conn.cursor()
+
+    # NOTIFY setiap pesan baru / read receipt → halaman chat tidak perlu polling DB
+    cur.execute("""
+    CREATE OR REPLACE FUNCTION notify_chat() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('chat_events', NEW.sender || ',' || NEW.receiver);
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """)
+
+    cur.execute("DROP TRIGGER IF EXISTS chat_notify ON chat")
+    cur.execute("""
+    CREATE TRIGGER chat_notify AFTER INSERT OR UPDATE ON chat
+    FOR EACH ROW EXECUTE FUNCTION notify_chat()
+    """)
+
+
+# ======================================================
+# INDEX (SQLITE + POSTGRES)
+# ======================================================
+# (nama, tabel, kolom, unique)
+INDEXES = [
+    ("idx_article_likes_unique", "article_likes", "article_id, username", True),
+    ("idx_article_comments_article", "article_comments", "article_id, created_at", False),
+    ("idx_chat_unread", "chat", "receiver, sender, is_read", False),
+    ("idx_chat_pair", "chat", "sender, receiver, id", False),
+    ("idx_articles_author", "articles", "author, created_at", False),
+    ("idx_articles_created", "articles", "created_at", False),
+]
+
+# watermark notify.SqliteProbe: MAX(id) per penerima / read receipt per pengirim
+WATERMARK_INDEXES = [
+    ("idx_chat_receiver_id", "chat", "receiver, id", False),
+    ("idx_chat_sender_read_id", "chat", "sender, is_read, id", False),
+]
+
+
+def create_indexes(conn, indexes):
+    cur = conn.cursor()
+    for name, table, columns, unique in indexes:
+        cur.execute(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS "
+            f"{name} ON {table} ({columns})"
+        )
+
+
+def init_indexes(conn):
+    cur = conn.cursor()
+
+    # like dobel harus dibuang dulu sebelum unique index bisa dibuat
+    cur.execute("""
+    DELETE FROM article_likes
+    WHERE id NOT IN (
+        SELECT MIN(id) FROM article_likes GROUP BY article_id, username
+    )
+    """)
+
+    create_indexes(conn, INDEXES)
+
+
+# query yang jalan di setiap rerun → harus pakai index
+HOT_QUERIES = [
+    ("reader likes", """
+        SELECT article_id, COUNT(*) FROM article_likes
+        WHERE article_id IN (?, ?) GROUP BY article_id
+    """, (1, 2)),
+    ("reader liked", """
+        SELECT article_id FROM article_likes
+        WHERE username=? AND article_id IN (?, ?)
+    """, ("admin", 1, 2)),
+    ("reader comments", """
+        SELECT article_id, username, comment, created_at FROM article_comments
+        WHERE article_id IN (?, ?) ORDER BY article_id, created_at
+    """, (1, 2)),
+    ("reader listing", """
+        SELECT * FROM articles ORDER BY created_at DESC LIMIT ? OFFSET ?
+    """, (10, 0)),
+    ("my articles", """
+        SELECT * FROM articles WHERE author=? ORDER BY created_at DESC
+    """, ("admin",)),
+    ("unread per sender", """
+        SELECT sender, COUNT(*) FROM chat
+        WHERE receiver=? AND is_read=0
+        GROUP BY sender
+    """, ("admin",)),
+    ("chat window", """
+        SELECT * FROM chat WHERE sender=? AND receiver=? AND id < ?
+        ORDER BY id DESC LIMIT ?
+    """, ("admin", "user", 100, 50)),
+    ("chat delta", """
+        SELECT * FROM chat
+        WHERE ((sender=? AND receiver=?) OR (sender=? AND receiver=?)) AND id > ?
+        ORDER BY id
+    """, ("admin", "user", "user", "admin", 0)),
+    ("chat read receipt", """
+        SELECT id FROM chat
+        WHERE sender=? AND receiver=? AND id >= ? AND is_read=1
+    """, ("admin", "user", 0)),
+    ("notify watermark pesan", """
+        SELECT MAX(id) FROM chat WHERE receiver=?
+    """, ("admin",)),
+    ("notify watermark dibaca", """
+        SELECT MAX(id) FROM chat WHERE sender=? AND is_read=1
+    """, ("admin",)),
+    ("login", """
+        SELECT password, role FROM users WHERE username=?
+    """, ("admin",)),
+]
+
+
+def _plan_scans_sqlite(conn, sql, params):
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    # "SCAN t" = full scan; "SCAN t USING INDEX" = urutan dari index, aman
+    return [r[3] for r in rows if r[3].startswith("SCAN") and "USING" not in r[3]]
+
+
+def _plan_scans_postgres(conn, sql, params):
+    # tabel kecil/baru selalu dapat Seq Scan karena paling murah; dengan
+    # enable_seqscan=off yang tersisa hanya Seq Scan yang memang tanpa index
+    raw = conn.raw
+    raw.autocommit = False
+    try:
+        cur = raw.cursor()
+        cur.execute("SET LOCAL enable_seqscan = off")
+        cur.execute(conn._native(f"EXPLAIN (FORMAT JSON) {sql}", params), tuple(params))
+        plan = cur.fetchone()[0][0]["Plan"]
+    finally:
+        raw.rollback()
+        raw.autocommit = True
+
+    scans = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        if node["Node Type"] == "Seq Scan":
+            scans.append(f"Seq Scan on {node['Relation Name']}")
+        stack += node.get("Plans", [])
+    return scans
+
+
+def explain_hot_queries(conn):
+    """[(nama query, [full scan...])] untuk setiap hot query yang masih scan tabel."""
+    report = []
+    for name, sql, params in HOT_QUERIES:
+        if is_postgres(conn):
+            scans = _plan_scans_postgres(conn, sql, params)
+        else:
+            scans = _plan_scans_sqlite(conn, sql, params)
+        if scans:
+            report.append((name, scans))
+    return report
 
 
 # ======================================================
-# SQLITE MIGRATION (tetap jalan jika lokal)
+# MIGRATION (versi schema, SQLITE + POSTGRES)
 # ======================================================
-def ensure_column(conn, table, column, col_type):
+def ensure_column(conn, backend, table, column, col_type):
     cur = conn.cursor()
+    if backend == "postgres":
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {col_type}")
+        return
+
     cur.execute(f"PRAGMA table_info({table})")
     cols = [c[1] for c in cur.fetchall()]
 
     if column not in cols:
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {col_type}")
-        conn.commit()
 
 
-def migrate():
-    if not os.path.exists(DB_PATH):
+def _m_base_tables(conn, backend):
+    if backend == "postgres":
+        init_db_postgres(conn)
+    else:
+        init_db_sqlite(conn)
+
+
+def _m_legacy_columns(conn, backend):
+    # kolom yang dulu ditambahkan lewat ensure_column di setiap import
+    ensure_column(conn, backend, "users", "name", "TEXT")
+    ensure_column(conn, backend, "users", "bio", "TEXT")
+    ensure_column(conn, backend, "users", "avatar", "TEXT")
+
+    ensure_column(conn, backend, "articles", "attachment", "TEXT")
+    ensure_column(conn, backend, "articles", "chart_config", "TEXT")
+
+    ensure_column(conn, backend, "chat", "is_read", "INTEGER DEFAULT 0")
+
+
+def _m_fulltext(conn, backend):
+    if backend == "postgres":
+        init_fts_postgres(conn)
+    else:
+        init_fts_sqlite(conn)
+
+
+def _m_indexes(conn, backend):
+    init_indexes(conn)
+
+
+def _m_watermark_indexes(conn, backend):
+    create_indexes(conn, WATERMARK_INDEXES)
+
+
+def _m_chat_notify(conn, backend):
+    if backend == "postgres":
+        init_chat_notify_postgres(conn)
+
+
+def _m_blobs(conn, backend):
+    # file upload content-addressed (lihat storage.py)
+    conn.cursor().execute("""
+    CREATE TABLE IF NOT EXISTS blobs (
+        hash TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        name TEXT,
+        size BIGINT,
+        mime TEXT,
+        refs INTEGER DEFAULT 0,
+        created_at TEXT
+    )
+    """)
+
+
+def _m_translations(conn, backend):
+    # cache terjemahan persisten (lihat translate.py)
+    conn.cursor().execute("""
+    CREATE TABLE IF NOT EXISTS translations (
+        content_hash TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        text TEXT,
+        backend TEXT,
+        created_at TEXT,
+        PRIMARY KEY (content_hash, lang)
+    )
+    """)
+
+
+DERIVED_COLUMNS = [
+    ("content_html", "TEXT"),
+    ("content_text", "TEXT"),
+    ("snippet", "TEXT"),
+    ("word_count", "INTEGER"),
+]
+BACKFILL_BATCH = 500
+
+
+def backfill_derived(conn, backend, batch=BACKFILL_BATCH):
+    """Isi field turunan artikel lama per batch (keyset pada id)."""
+    from articles import derive_fields
+
+    ph = "%s" if backend == "postgres" else "?"
+    cur = conn.cursor()
+    last_id = 0
+    while True:
+        cur.execute(
+            f"SELECT id, content FROM articles WHERE id > {ph} ORDER BY id LIMIT {ph}",
+            (last_id, batch)
+        )
+        rows = cur.fetchall()
+        if not rows:
+            break
+        updates = []
+        for article_id, content in rows:
+            d = derive_fields(content)
+            updates.append((
+                d["content_html"], d["content_text"], d["snippet"], d["word_count"],
+                article_id
+            ))
+        cur.executemany(f"""
+            UPDATE articles
+            SET content_html={ph}, content_text={ph}, snippet={ph}, word_count={ph}
+            WHERE id={ph}
+        """, updates)
+        last_id = rows[-1][0]
+
+
+def init_fts_text_sqlite(conn):
+    """FTS5 mengindeks content_text (bukan markdown/HTML mentah)."""
+    cur = conn.cursor()
+    for trigger in ("articles_fts_ai", "articles_fts_ad", "articles_fts_au"):
+        cur.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cur.execute("DROP TABLE IF EXISTS articles_fts")
+
+    try:
+        cur.execute("""
+        CREATE VIRTUAL TABLE articles_fts USING fts5(
+            title,
+            content_text,
+            content='articles',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """)
+    except sqlite3.OperationalError as e:
+        print("FTS5 tidak tersedia:", e)
         return
 
-    conn = sqlite3.connect(DB_PATH)
+    cur.execute("""
+    CREATE TRIGGER articles_fts_ai AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts(rowid, title, content_text)
+        VALUES (new.id, new.title, new.content_text);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER articles_fts_ad AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content_text)
+        VALUES ('delete', old.id, old.title, old.content_text);
+    END
+    """)
+
+    cur.execute("""
+    CREATE TRIGGER articles_fts_au AFTER UPDATE ON articles BEGIN
+        INSERT INTO articles_fts(articles_fts, rowid, title, content_text)
+        VALUES ('delete', old.id, old.title, old.content_text);
+        INSERT INTO articles_fts(rowid, title, content_text)
+        VALUES (new.id, new.title, new.content_text);
+    END
+    """)
 
-    ensure_column(conn, "users", "name", "TEXT")
-    ensure_column(conn, "users", "bio", "TEXT")
-    ensure_column(conn, "users", "avatar", "TEXT")
+    cur.execute("INSERT INTO articles_fts(articles_fts) VALUES ('rebuild')")
 
-    ensure_column(conn, "articles", "attachment", "TEXT")
-    ensure_column(conn, "articles", "chart_config", "TEXT")
 
-    ensure_column(conn, "chat", "is_read", "INTEGER DEFAULT 0")
+def init_fts_text_postgres(conn):
+    cur = conn.cursor()
+    cur.execute("DROP INDEX IF EXISTS idx_articles_search")
+    cur.execute("ALTER TABLE articles DROP COLUMN IF EXISTS search_vector")
+    cur.execute("""
+    ALTER TABLE articles ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('simple', coalesce(content_text, '')), 'B')
+    ) STORED
+    """)
+    cur.execute("""
+    CREATE INDEX idx_articles_search
+    ON articles USING GIN (search_vector)
+    """)
+
+
+def rederive(conn, backend):
+    """Backfill semua field turunan; FTS5 SQLite dibangun ulang sekali di akhir."""
+    if backend == "postgres":
+        backfill_derived(conn, backend)   # search_vector generated → ikut terupdate
+        return
+
+    # trigger FTS lama dilepas dulu supaya backfill tidak meng-index ulang per baris
+    has_fts = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='articles_fts'"
+    ).fetchone()
+    if has_fts:
+        for trigger in ("articles_fts_ai", "articles_fts_ad", "articles_fts_au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    backfill_derived(conn, backend)
+    if has_fts:
+        init_fts_text_sqlite(conn)
+
+
+def _m_derived_fields(conn, backend):
+    for column, col_type in DERIVED_COLUMNS:
+        ensure_column(conn, backend, "articles", column, col_type)
+
+    rederive(conn, backend)
+    if backend == "postgres":
+        init_fts_text_postgres(conn)
+
+
+def _m_rederive_fields(conn, backend):
+    # derive_fields diperbaiki (<br> ganda, tanda # _ * hilang dari teks) → hitung ulang
+    rederive(conn, backend)
+
+
+# (versi, nama, fungsi) — urutan tetap, jangan ubah migrasi yang sudah rilis
+MIGRATIONS = [
+    (1, "base tables", _m_base_tables),
+    (2, "legacy columns", _m_legacy_columns),
+    (3, "full-text search", _m_fulltext),
+    (4, "hot path indexes", _m_indexes),
+    (5, "chat notify trigger", _m_chat_notify),
+    (6, "blob store", _m_blobs),
+    (7, "translation cache", _m_translations),
+    (8, "derived article fields", _m_derived_fields),
+    (9, "re-derive article fields", _m_rederive_fields),
+    (10, "notify watermark indexes", _m_watermark_indexes),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+MIGRATION_LOCK_ID = 727001   # pg_advisory_xact_lock: satu proses migrasi sekaligus
+
+
+def schema_version(conn):
+    cur = conn.cursor()
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT,
+        applied_at TEXT
+    )
+    """)
+    cur.execute("SELECT MAX(version) FROM schema_version")
+    return cur.fetchone()[0] or 0
+
+
+def migrate(conn, backend):
+    """Terapkan migrasi yang belum jalan dalam satu transaksi; return nama migrasinya."""
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return []
+
+    ph = "%s" if backend == "postgres" else "?"
+    cur = conn.cursor()
+    if backend == "postgres":
+        conn.autocommit = False
+        cur.execute(f"SELECT pg_advisory_xact_lock({ph})", (MIGRATION_LOCK_ID,))
+    else:
+        cur.execute("BEGIN IMMEDIATE")
+
+    applied = []
+    try:
+        # cek ulang di dalam lock: proses lain mungkin baru selesai migrasi
+        current = schema_version(conn)
+        for version, name, fn in MIGRATIONS:
+            if version <= current:
+                continue
+            fn(conn, backend)
+            cur.execute(
+                f"INSERT INTO schema_version(version, name, applied_at) VALUES ({ph}, {ph}, {ph})",
+                (version, name, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            applied.append(name)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if backend == "postgres":
+            conn.autocommit = True
 
-    conn.close()
+    if applied:
+        print("SCHEMA migrated:", ", ".join(applied))
+    return applied
 
 
-migrate()
+if __name__ == "__main__":
+    # python db.py → cek hot query yang masih full scan
+    report = explain_hot_queries(get_db())
+    for name, scans in report:
+        print(f"SCAN  {name}: {'; '.join(scans)}")
+    print("OK, semua hot query pakai index" if not report else f"{len(report)} query masih scan")
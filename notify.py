@@ -0,0 +1,113 @@
+import os
+import select
+import threading
+import time
+
+from db import DB_PATH, is_postgres, connect_sqlite
+
+CHANNEL = "chat_events"
+
+# detik idle → interval cek perubahan (makin lama idle makin jarang)
+POLL_TIERS = [(0, 2), (30, 5), (300, 15)]
+
+_versions = {}   # user -> counter perubahan chat milik user
+_lock = threading.Lock()
+
+
+def bump(*users):
+    with _lock:
+        for u in users:
+            _versions[u] = _versions.get(u, 0) + 1
+
+
+def version(user):
+    return _versions.get(user, 0)
+
+
+def poll_interval(idle):
+    interval = POLL_TIERS[0][1]
+    for since, every in POLL_TIERS:
+        if idle >= since:
+            interval = every
+    return interval
+
+
+# ======================================================
+# POSTGRES: LISTEN/NOTIFY → bump counter di proses ini
+# ======================================================
+class PostgresListener(threading.Thread):
+    daemon = True
+
+    def __init__(self, database_url):
+        super().__init__(name="chat-listener")
+        self.database_url = database_url
+
+    def run(self):
+        import psycopg2
+
+        while True:
+            try:
+                conn = psycopg2.connect(self.database_url, sslmode="require")
+                conn.autocommit = True
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                while True:
+                    if select.select([conn], [], [], 60) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        bump(*conn.notifies.pop(0).payload.split(","))
+            except Exception as e:
+                print("CHAT LISTENER putus, reconnect:", e)
+                time.sleep(5)
+
+
+# ======================================================
+# SQLITE: PRAGMA data_version + watermark per user
+# ======================================================
+class SqliteProbe:
+    def __init__(self, path=DB_PATH):
+        # koneksi khusus probe: data_version berubah kalau koneksi LAIN commit
+        self.conn = connect_sqlite(path)
+        self.lock = threading.Lock()
+        self.data_version = None
+        self.marks = {}
+
+    def watermark(self, user):
+        with self.lock:
+            dv = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            if dv != self.data_version:
+                self.data_version = dv
+                self.marks.clear()
+            if user not in self.marks:
+                # pesan terakhir untuk user + read receipt terakhir pesan user
+                self.marks[user] = self.conn.execute("""
+                    SELECT
+                        (SELECT MAX(id) FROM chat WHERE receiver=?),
+                        (SELECT MAX(id) FROM chat WHERE sender=? AND is_read=1)
+                """, (user, user)).fetchone()
+            return self.marks[user]
+
+
+_probe = None
+_listener = None
+_start_lock = threading.Lock()
+
+
+def start(conn):
+    """Pasang sumber notifikasi sesuai backend koneksi (sekali per proses)."""
+    global _probe, _listener
+    with _start_lock:
+        if _probe or _listener:
+            return
+        if is_postgres(conn):
+            _listener = PostgresListener(os.getenv("DATABASE_URL"))
+            _listener.start()
+        else:
+            _probe = SqliteProbe()
+
+
+def change_token(user):
+    """Berubah setiap ada pesan baru / read receipt untuk user."""
+    if _probe:
+        return (version(user), _probe.watermark(user))
+    return (version(user), None)
@@ -0,0 +1,148 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.getenv("AUTH_WORKERS", str(os.cpu_count() or 1)))
+AUTH_MAX_INFLIGHT = int(os.getenv("AUTH_MAX_INFLIGHT", str(AUTH_WORKERS * 4)))
+AUTH_PER_USER = int(os.getenv("AUTH_PER_USER", "1"))
+AUTH_QUEUE_TIMEOUT = float(os.getenv("AUTH_QUEUE_TIMEOUT", "3"))
+
+
+class AuthBusy(Exception):
+    pass
+
+
+# ======================================================
+# KERJA BCRYPT (jalan di proses worker, tanpa GIL proses utama)
+# ======================================================
+def _encode(h):
+    return h.encode() if isinstance(h, str) else bytes(h)
+
+
+def cost(h):
+    """Cost factor dari hash bcrypt ($2b$12$...)."""
+    try:
+        return int(_encode(h).split(b"$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _verify(password, stored, rounds):
+    """(cocok, hash baru kalau cost berubah) dalam satu kali kirim ke worker."""
+    if not bcrypt.checkpw(password.encode(), _encode(stored)):
+        return False, None
+    if cost(stored) != rounds:
+        return True, _hash(password, rounds)
+    return True, None
+
+
+def _mp_context():
+    """
+    forkserver: worker di-fork dari proses server tersendiri, bukan dari
+    server Streamlit yang multithread (fork di sana bisa deadlock).
+
+    Catatan: Streamlit memasang app.py sebagai __main__, jadi setiap worker
+    tetap mengimpor ulang app.py sebagai __mp_main__. Karena itu app.py
+    hanya mendefinisikan main() (import streamlit/db di dalamnya), dan
+    auth/views mengambil koneksi DB di dalam fungsi, bukan saat diimpor.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()   # Windows: spawn
+    ctx = multiprocessing.get_context("forkserver")
+    ctx.set_forkserver_preload(["bcrypt", "passwords"])
+    return ctx
+
+
+# ======================================================
+# POOL PROSES + ADMISSION CONTROL
+# ======================================================
+class PasswordPool:
+    def __init__(self, workers=AUTH_WORKERS, max_inflight=AUTH_MAX_INFLIGHT,
+                 per_user=AUTH_PER_USER, timeout=AUTH_QUEUE_TIMEOUT, rounds=BCRYPT_ROUNDS):
+        self.workers = workers
+        self.per_user = per_user
+        self.timeout = timeout
+        self.rounds = rounds
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._users = {}   # username -> jumlah verifikasi yang sedang jalan
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=_mp_context()
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        try:
+            return self._pool().submit(fn, *args).result()
+        except BrokenProcessPool:
+            with self._lock:
+                self._executor = None   # worker mati → buat pool baru sekali
+            return self._pool().submit(fn, *args).result()
+
+    def _admit(self, user):
+        with self._lock:
+            if user is not None:
+                if self._users.get(user, 0) >= self.per_user:
+                    raise AuthBusy("login untuk user ini sedang diproses")
+                self._users[user] = self._users.get(user, 0) + 1
+        if not self._slots.acquire(timeout=self.timeout):
+            self._leave(user)
+            raise AuthBusy("terlalu banyak login bersamaan")
+
+    def _leave(self, user):
+        if user is None:
+            return
+        with self._lock:
+            self._users[user] -= 1
+            if not self._users[user]:
+                del self._users[user]
+
+    # ---------- API ----------
+    def hash(self, password, user=None):
+        self._admit(user)
+        try:
+            return self._run(_hash, password, self.rounds)
+        finally:
+            self._slots.release()
+            self._leave(user)
+
+    def verify(self, user, password, stored):
+        """(cocok, hash baru atau None); hash baru disimpan pemanggil."""
+        self._admit(user)
+        try:
+            return self._run(_verify, password, stored, self.rounds)
+        finally:
+            self._slots.release()
+            self._leave(user)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordPool()
+        return _pool
@@ -0,0 +1,435 @@
+"""
+Benchmark hot path aplikasi di atas data sintetis: search, ringkasan, unread,
+room chat dan data halaman baca, di beberapa ukuran data.
+
+    python scripts/bench_app.py --sizes 1000,10000
+    python scripts/bench_app.py --save-baseline        # simpan bench_baseline.json
+    python scripts/bench_app.py --compare              # bandingkan dengan baseline
+    python scripts/bench_app.py --generate-only /tmp/kb.db --sizes 5000
+
+Default hanya SQLite (DB sementara). Postgres ikut diukur kalau
+BENCH_DATABASE_URL di-set; tabelnya DI-TRUNCATE, jadi pakai database kosong.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "bench_baseline.json")
+
+BENCH_USER = "user0"
+BENCH_TARGET = "user1"   # lawan chat BENCH_USER dengan riwayat paling panjang
+PAGE_SIZE = 10
+
+# kata-kata dibobot Zipf supaya TF-IDF/FTS mirip korpus asli (ada kata umum & langka)
+WORDS = """
+data sistem aplikasi pengguna server laporan jaringan proses database keamanan
+akses tim proyek analisis model kinerja layanan klien backup kebijakan perangkat
+integrasi dokumen modul versi konfigurasi prosedur monitoring insiden jadwal
+anggaran target evaluasi risiko kualitas pelatihan migrasi arsitektur antarmuka
+infrastruktur kapasitas lisensi vendor kontrak audit log alert dashboard metrik
+query indeks cache replikasi cluster container deployment pipeline repository
+branch review testing regresi rilis hotfix patch firewall vpn enkripsi sertifikat
+token sesi password otentikasi otorisasi role izin grup departemen keuangan gudang
+produksi penjualan pelanggan pemasok faktur pembayaran stok pengiriman retur
+survei statistik grafik tren prediksi klasifikasi regresi klaster sampel populasi
+variabel hipotesis korelasi dataset pipeline ekstraksi transformasi validasi
+""".split()
+FILLER = "yang dan di ke dari untuk dengan pada adalah ini itu akan dalam tidak juga".split()
+WEIGHTS = [1 / (i + 1) for i in range(len(WORDS))]
+QUERIES = ["database", "keamanan jaringan", "migrasi server", "laporan penjualan",
+           "cache query indeks", "sertifikat enkripsi vpn", "zzzkatatidakada"]
+
+# jumlah per artikel / total; bisa diubah lewat argumen
+DEFAULTS = {"users": 50, "likes": 5.0, "comments": 2.0, "messages": 20.0}
+
+
+# ======================================================
+# DATA SINTETIS
+# ======================================================
+def _words(rng, n):
+    out = []
+    for w in rng.choices(WORDS, weights=WEIGHTS, k=n):
+        out.append(w)
+        if rng.random() < 0.35:
+            out.append(rng.choice(FILLER))
+    return out
+
+
+def _sentence(rng, lo=6, hi=18):
+    words = _words(rng, rng.randint(lo, hi))
+    if rng.random() < 0.15:
+        i = rng.randrange(len(words))
+        words[i] = f"**{words[i]}**"
+    return " ".join(words).capitalize() + "."
+
+
+def markdown_article(rng):
+    """Markdown dengan panjang log-normal (median ~400 kata) + heading, list, kode."""
+    target = int(min(max(rng.lognormvariate(6.0, 0.7), 40), 6000))
+    parts, total = [], 0
+    while total < target:
+        r = rng.random()
+        if r < 0.12:
+            block = "## " + " ".join(_words(rng, rng.randint(2, 5))).title()
+        elif r < 0.22:
+            block = "\n".join(f"- {_sentence(rng, 3, 8)}" for _ in range(rng.randint(2, 6)))
+        elif r < 0.26:
+            block = "```\nSELECT * FROM " + rng.choice(WORDS) + " LIMIT 10;\n```"
+        elif r < 0.30:
+            block = f"Lihat [{rng.choice(WORDS)}](https://example.com/{rng.choice(WORDS)})."
+        else:
+            block = " ".join(_sentence(rng) for _ in range(rng.randint(2, 7)))
+        parts.append(block)
+        total += len(block.split())
+    return "\n\n".join(parts)
+
+
+def sizes_for(articles, args):
+    return {
+        "articles": articles,
+        "users": args.users,
+        "likes": int(articles * args.likes),
+        "comments": int(articles * args.comments),
+        "messages": int(articles * args.messages),
+    }
+
+
+def generate(conn, counts, seed=42, batch=1000):
+    """Isi users, articles (+ kolom turunan), likes, komentar dan chat."""
+    import bcrypt
+    from articles import derive_fields
+    from db import DERIVED_COLUMNS
+
+    rng = random.Random(seed)
+    users = [f"user{i}" for i in range(counts["users"])]
+    start = datetime(2023, 1, 1)
+    span = 3 * 365 * 24 * 3600
+
+    def ts(i, n):
+        # waktu naik sesuai urutan id, seperti data asli
+        return (start + timedelta(seconds=span * i // max(n, 1))).strftime("%Y-%m-%d %H:%M:%S")
+
+    def flush(table, columns, rows):
+        if rows:
+            conn.copy_rows(table, columns, rows)
+            rows.clear()
+
+    # satu hash murah dipakai semua user: yang diukur bukan bcrypt
+    pw = bcrypt.hashpw(b"rahasia", bcrypt.gensalt(4)).decode()
+    conn.copy_rows(
+        "users", ["username", "password", "role", "name", "bio"],
+        [(u, pw, "admin" if i == 0 else "user", f"User {i}", _sentence(rng))
+         for i, u in enumerate(users)]
+    )
+
+    derived_columns = [c for c, _ in DERIVED_COLUMNS]
+    columns = ["title", "content", "author", "created_at"] + derived_columns
+    rows = []
+    for i in range(counts["articles"]):
+        content = markdown_article(rng)
+        derived = derive_fields(content)
+        rows.append([
+            " ".join(_words(rng, rng.randint(3, 8))).title(),
+            content, rng.choice(users), ts(i, counts["articles"]),
+        ] + [derived[c] for c in derived_columns])
+        if len(rows) >= batch:
+            flush("articles", columns, rows)
+    flush("articles", columns, rows)
+    conn.commit()
+
+    ids = [r[0] for r in conn.execute("SELECT id FROM articles ORDER BY id").fetchall()]
+    # artikel lama/populer dapat lebih banyak like & komentar
+    popular = [1 / (i + 1) ** 0.8 for i in range(len(ids))]
+
+    likes = set()
+    for article_id in rng.choices(ids, weights=popular, k=counts["likes"]):
+        likes.add((article_id, rng.choice(users)))
+    likes = list(likes)
+    for i in range(0, len(likes), batch):
+        flush("article_likes", ["article_id", "username"], likes[i:i + batch])
+
+    n = counts["comments"]
+    rows = []
+    for i, article_id in enumerate(rng.choices(ids, weights=popular, k=n)):
+        rows.append((article_id, rng.choice(users), _sentence(rng, 4, 25), ts(i, n)))
+        if len(rows) >= batch:
+            flush("article_comments", ["article_id", "username", "comment", "created_at"], rows)
+    flush("article_comments", ["article_id", "username", "comment", "created_at"], rows)
+
+    # chat: sebagian besar antar pasangan acak, 10% room BENCH_USER ↔ BENCH_TARGET
+    n = counts["messages"]
+    rows = []
+    for i in range(n):
+        if rng.random() < 0.1:
+            sender, receiver = rng.sample([BENCH_USER, BENCH_TARGET], 2)
+        else:
+            sender, receiver = rng.sample(users, 2)
+        # pesan terbaru (5% terakhir) sebagian belum dibaca
+        unread = i > n * 0.95 and rng.random() < 0.5
+        rows.append((sender, receiver, _sentence(rng, 2, 20), ts(i, n), 0 if unread else 1))
+        if len(rows) >= batch:
+            flush("chat", ["sender", "receiver", "message", "created_at", "is_read"], rows)
+    flush("chat", ["sender", "receiver", "message", "created_at", "is_read"], rows)
+    conn.commit()
+
+
+def reset(conn):
+    """Kosongkan tabel data (hanya dipanggil untuk DB benchmark)."""
+    tables = ["article_comments", "article_likes", "chat", "articles", "users"]
+    if conn.backend == "postgres":
+        conn.execute(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY")
+    else:
+        for table in tables:
+            conn.execute(f"DELETE FROM {table}")
+    conn.commit()
+
+
+# ======================================================
+# PENGUKURAN (jalan di proses worker, DB sudah menunjuk data sintetis)
+# ======================================================
+def percentile(samples, p):
+    ordered = sorted(samples)
+    i = min(len(ordered) - 1, max(0, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[i]
+
+
+def measure(fn, repeat, warmup=2):
+    """p50/p95 (ms) dari repeat panggilan + peak alokasi Python (KiB) satu panggilan."""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+
+    # tracemalloc memperlambat → diukur terpisah dari waktu
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn(repeat)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def run_worker(counts, repeat, seed):
+    from db import get_db
+
+    conn = get_db()
+    expected = "postgres" if os.getenv("DATABASE_URL") else "sqlite"
+    if conn.backend != expected:
+        raise SystemExit(f"backend {conn.backend}, seharusnya {expected}")
+
+    started = time.perf_counter()
+    reset(conn)
+    generate(conn, counts, seed)
+    generate_s = time.perf_counter() - started
+
+    import ai
+    import chat
+    from articles import load_reader_data
+    from search import get_index, search_cache
+    from views.reader import search_articles, summarize_query
+
+    started = time.perf_counter()
+    get_index(conn)
+    index_s = time.perf_counter() - started
+
+    rng = random.Random(seed)
+    ids = [r[0] for r in conn.execute("SELECT id FROM articles").fetchall()]
+    pages = [rng.sample(ids, min(PAGE_SIZE, len(ids))) for _ in range(32)]
+    users = [r[0] for r in conn.execute("SELECT username FROM users").fetchall()]
+    last_id = conn.execute("SELECT MAX(id) FROM chat").fetchone()[0] or 0
+
+    def cold_search(i):
+        # cache hasil & memo ringkasan dikosongkan → jalur penuh tiap panggilan
+        search_cache.clear()
+        ai._memo.clear()
+        search_articles(QUERIES[i % len(QUERIES)])
+
+    def warm_search(i):
+        search_articles(QUERIES[i % len(QUERIES)])
+
+    def summary(i):
+        ai._memo.clear()
+        summarize_query(QUERIES[i % len(QUERIES)])
+
+    def unread(i):
+        user = users[i % len(users)]
+        chat.invalidate_unread(user)
+        chat.unread_count(user)
+
+    def room_open(i):
+        chat.fetch_before(BENCH_USER, BENCH_TARGET)
+
+    def room_older(i):
+        # scroll ke atas: halaman sebelum pesan ke-(i+1)*CHAT_WINDOW dari akhir
+        chat.fetch_before(BENCH_USER, BENCH_TARGET, before_id=last_id - (i % 8 + 1) * 500)
+
+    def room_poll(i):
+        chat.fetch_after(BENCH_USER, BENCH_TARGET, last_id - 100)
+
+    def reader_data(i):
+        load_reader_data(conn, pages[i % len(pages)], users[i % len(users)])
+
+    results = {
+        "search_articles": measure(cold_search, repeat),
+        "search_articles (cache)": measure(warm_search, repeat, warmup=len(QUERIES)),
+        "ai_summary": measure(summary, repeat),
+        "unread_count": measure(unread, repeat),
+        "chat fetch_before": measure(room_open, repeat),
+        "chat fetch_before (older)": measure(room_older, repeat),
+        "chat fetch_after": measure(room_poll, repeat),
+        "load_reader_data": measure(reader_data, repeat),
+    }
+    # ru_maxrss: KiB di Linux, byte di macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss_mib = rss / 1024 / (1024 if sys.platform == "darwin" else 1)
+    return {
+        "counts": counts,
+        "generate_s": round(generate_s, 2),
+        "index_build_s": round(index_s, 2),
+        "max_rss_mib": round(rss_mib, 1),
+        "ops": results,
+    }
+
+
+# ======================================================
+# ORKESTRASI (satu proses baru per backend × ukuran)
+# ======================================================
+def backends():
+    out = [("sqlite", None)]
+    if os.getenv("BENCH_DATABASE_URL"):
+        out.append(("postgres", os.environ["BENCH_DATABASE_URL"]))
+    return out
+
+
+def spawn(counts, database_url, args, tmp):
+    # cwd = folder sementara → search_index.pkl, uploads/ dll. tidak menyentuh repo
+    env = dict(os.environ, DB_PATH=os.path.join(tmp, f"bench_{counts['articles']}.db"),
+               PYTHONPATH=ROOT)
+    env.pop("DATABASE_URL", None)
+    if database_url:
+        env["DATABASE_URL"] = database_url
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", json.dumps(counts),
+         "--repeat", str(args.repeat), "--seed", str(args.seed)],
+        cwd=tmp, env=env, capture_output=True, text=True
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip() or proc.stdout.strip())
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def report(key, result, baseline=None, threshold=20.0):
+    """Cetak satu hasil; return jumlah op yang p50-nya melambat > threshold %."""
+    c = result["counts"]
+    print(f"\n== {key}: {c['articles']} artikel, {c['users']} user, {c['likes']} like, "
+          f"{c['comments']} komentar, {c['messages']} chat")
+    print(f"   generate {result['generate_s']}s, index {result['index_build_s']}s, "
+          f"max RSS {result['max_rss_mib']} MiB")
+    header = f"{'op':<28}{'p50 ms':>10}{'p95 ms':>10}{'peak KiB':>10}"
+    if baseline:
+        header += f"{'Δp50':>9}"
+    print(header)
+
+    regressions = 0
+    for op, r in result["ops"].items():
+        line = f"{op:<28}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['peak_kib']:>10.1f}"
+        old = (baseline or {}).get("ops", {}).get(op)
+        if old and old["p50_ms"] > 0:
+            delta = (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+            line += f"{delta:>+8.0f}%"
+            if delta > threshold:
+                line += "  REGRESI"
+                regressions += 1
+        print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="1000,5000", help="jumlah artikel, pisah koma")
+    parser.add_argument("--users", type=int, default=DEFAULTS["users"])
+    parser.add_argument("--likes", type=float, default=DEFAULTS["likes"], help="per artikel")
+    parser.add_argument("--comments", type=float, default=DEFAULTS["comments"], help="per artikel")
+    parser.add_argument("--messages", type=float, default=DEFAULTS["messages"], help="per artikel")
+    parser.add_argument("--repeat", type=int, default=30, help="sampel per op")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, metavar="PATH")
+    parser.add_argument("--compare", nargs="?", const=BASELINE_PATH, metavar="PATH")
+    parser.add_argument("--threshold", type=float, default=20.0, help="%% p50 dianggap regresi")
+    parser.add_argument("--generate-only", metavar="DB_PATH",
+                        help="hanya buat knowledgebase.db sintetis (SQLite) di path ini")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(json.loads(args.worker), args.repeat, args.seed)
+        print(json.dumps(result))
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    if args.generate_only:
+        if os.path.exists(args.generate_only):
+            raise SystemExit(f"{args.generate_only} sudah ada, tidak ditimpa")
+        os.environ["DB_PATH"] = os.path.abspath(args.generate_only)
+        os.environ.pop("DATABASE_URL", None)
+        sys.path.insert(0, ROOT)
+        from db import get_db
+
+        counts = sizes_for(sizes[-1], args)
+        generate(get_db(), counts, args.seed)
+        print(f"{args.generate_only}: {counts}")
+        return
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+
+    results, regressions = {}, 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend, url in backends():
+            for articles in sizes:
+                key = f"{backend}/{articles}"
+                results[key] = spawn(sizes_for(articles, args), url, args, tmp)
+                regressions += report(key, results[key], (baseline or {}).get(key),
+                                      args.threshold)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "cpus": os.cpu_count(),
+                "repeat": args.repeat,
+                "results": results,
+            }, f, indent=2)
+        print(f"\nbaseline disimpan: {args.save_baseline}")
+
+    if regressions:
+        print(f"\n{regressions} op melambat > {args.threshold:.0f}% dari baseline")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
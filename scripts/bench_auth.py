@@ -0,0 +1,78 @@
+"""
+Benchmark throughput login (bcrypt verify) terhadap jumlah worker proses.
+
+    python scripts/bench_auth.py --logins 64 --rounds 12
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import bcrypt
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passwords import AuthBusy, PasswordPool  # noqa: E402
+
+
+def inline(logins, stored):
+    # baseline: verifikasi langsung di thread pemanggil seperti sebelumnya
+    started = time.perf_counter()
+    threads = [
+        threading.Thread(target=bcrypt.checkpw, args=(b"rahasia", stored))
+        for _ in range(logins)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - started
+
+
+def pooled(workers, logins, stored, rounds):
+    pool = PasswordPool(workers=workers, max_inflight=logins, rounds=rounds, timeout=60)
+    pool.verify(None, "rahasia", stored)   # panaskan worker dulu
+    busy = []
+
+    def login(i):
+        try:
+            pool.verify(f"user{i}", "rahasia", stored)
+        except AuthBusy:
+            busy.append(i)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=login, args=(i,)) for i in range(logins)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    pool.shutdown()
+    return elapsed, len(busy)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+
+    stored = bcrypt.hashpw(b"rahasia", bcrypt.gensalt(args.rounds))
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)) | {cores})
+
+    print(f"{args.logins} login, cost {args.rounds}, {cores} core")
+    print(f"{'mode':<12}{'login/s':>10}{'ms/login':>10}{'busy':>6}")
+
+    elapsed = inline(args.logins, stored)
+    print(f"{'inline':<12}{args.logins / elapsed:>10.1f}{elapsed * 1000 / args.logins:>10.1f}{0:>6}")
+
+    for workers in counts:
+        elapsed, busy = pooled(workers, args.logins, stored, args.rounds)
+        print(f"{f'pool x{workers}':<12}{args.logins / elapsed:>10.1f}"
+              f"{elapsed * 1000 / args.logins:>10.1f}{busy:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark baca/tulis bersamaan: SQLite default vs mode tuned (WAL, mmap, dst).
+
+    python scripts/bench_sqlite.py --readers 8 --writers 2 --seconds 5
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import connect_sqlite, migrate  # noqa: E402
+
+USERS = [f"user{i}" for i in range(20)]
+
+
+def seed(path, articles, messages):
+    conn = connect_sqlite(path, tuned=False)
+    migrate(conn, "sqlite")
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn.executemany(
+        "INSERT INTO articles(title, content, author, created_at) VALUES (?,?,?,?)",
+        [(f"Artikel {i}", "isi artikel " * 200, random.choice(USERS), now)
+         for i in range(articles)]
+    )
+    conn.executemany(
+        "INSERT INTO chat(sender, receiver, message, created_at, is_read) VALUES (?,?,?,?,0)",
+        [(random.choice(USERS), random.choice(USERS), f"pesan {i}", now)
+         for i in range(messages)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(path, tuned, readers, writers, seconds):
+    stop = time.monotonic() + seconds
+    counts = {"reads": 0, "writes": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def reader():
+        conn = connect_sqlite(path, tuned)
+        n = locked = 0
+        while time.monotonic() < stop:
+            try:
+                user = random.choice(USERS)
+                conn.execute(
+                    "SELECT * FROM articles ORDER BY created_at DESC LIMIT 10"
+                ).fetchall()
+                conn.execute("""
+                    SELECT sender, COUNT(*) FROM chat
+                    WHERE receiver=? AND is_read=0 GROUP BY sender
+                """, (user,)).fetchall()
+                n += 1
+            except sqlite3.OperationalError:
+                locked += 1
+        with lock:
+            counts["reads"] += n
+            counts["locked"] += locked
+
+    def writer():
+        conn = connect_sqlite(path, tuned)
+        n = locked = 0
+        while time.monotonic() < stop:
+            try:
+                conn.execute(
+                    "INSERT INTO chat(sender, receiver, message, created_at, is_read) "
+                    "VALUES (?,?,?,?,0)",
+                    (random.choice(USERS), random.choice(USERS), "bench",
+                     datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+                conn.commit()
+                n += 1
+            except sqlite3.OperationalError:
+                conn.rollback()
+                locked += 1
+        with lock:
+            counts["writes"] += n
+            counts["locked"] += locked
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {k: v / seconds if k != "locked" else v for k, v in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for tuned in (False, True):
+            path = os.path.join(tmp, f"bench_{'tuned' if tuned else 'default'}.db")
+            seed(path, args.articles, args.messages)
+            results[tuned] = run(path, tuned, args.readers, args.writers, args.seconds)
+
+    print(f"{'mode':<10}{'reads/s':>12}{'writes/s':>12}{'locked':>10}")
+    for tuned, r in results.items():
+        name = "tuned" if tuned else "default"
+        print(f"{name:<10}{r['reads']:>12.0f}{r['writes']:>12.0f}{r['locked']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Pindahkan upload lama (uploads/<jenis>/<timestamp>_<nama>) ke blob store.
+
+File dengan isi sama jadi satu blob; semua kolom yang menunjuk ke path lama
+diarahkan ke path blob, lalu blob tanpa referensi di-GC.
+
+    python scripts/dedupe_uploads.py            # laporan saja
+    python scripts/dedupe_uploads.py --apply    # pindahkan + update DB
+    python scripts/dedupe_uploads.py --apply --delete-legacy   # + hapus file lama
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_db  # noqa: E402
+from storage import BLOB_DIR, REF_COLUMNS, gc, original_name, references, store  # noqa: E402
+
+LEGACY_DIRS = ["uploads/images", "uploads/pdfs", "uploads/csv", "uploads/chat", "uploads/avatars"]
+
+
+def legacy_paths(conn):
+    return sorted(
+        p for p in references(conn)
+        if not p.startswith(BLOB_DIR) and os.path.exists(p)
+    )
+
+
+def orphan_paths(conn):
+    """File di folder upload lama yang tidak dipakai baris mana pun."""
+    refs = references(conn)
+    return sorted(
+        os.path.join(d, name)
+        for d in LEGACY_DIRS if os.path.isdir(d)
+        for name in os.listdir(d)
+        if os.path.join(d, name) not in refs
+    )
+
+
+def rewrite(conn, old, new):
+    for table, column in REF_COLUMNS:
+        conn.execute(f"UPDATE {table} SET {column}=? WHERE {column}=?", (new, old))
+
+    # gambar artikel juga ditanam di markdown konten
+    conn.execute(
+        "UPDATE articles SET content=REPLACE(content, ?, ?) WHERE content LIKE ?",
+        (old, new, f"%{old}%")
+    )
+
+    for article_id, raw in conn.fetchall(
+        "SELECT id, chart_config FROM articles WHERE chart_config LIKE ?",
+        (f"%{json.dumps(old)[1:-1]}%",)
+    ):
+        cfg = json.loads(raw)
+        if cfg.get("csv") == old:
+            cfg["csv"] = new
+            conn.execute(
+                "UPDATE articles SET chart_config=? WHERE id=?",
+                (json.dumps(cfg), article_id)
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apply", action="store_true")
+    parser.add_argument("--delete-legacy", action="store_true")
+    args = parser.parse_args()
+
+    conn = get_db()
+    paths = legacy_paths(conn)
+    orphans = orphan_paths(conn)
+    before = sum(os.path.getsize(p) for p in paths)
+
+    if not args.apply:
+        print(f"{len(paths)} file lama dipakai ({before / 1024:.0f} KB), "
+              f"{len(orphans)} file lama tanpa referensi; jalankan dengan --apply")
+        return
+
+    moved = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            moved[path] = store(conn, f, original_name(path))
+        rewrite(conn, path, moved[path])
+    conn.commit()
+
+    after = sum(os.path.getsize(p) for p in set(moved.values()))
+    print(f"{len(moved)} file → {len(set(moved.values()))} blob "
+          f"({before / 1024:.0f} KB → {after / 1024:.0f} KB)")
+
+    if args.delete_legacy:
+        for path in list(moved) + orphans:
+            os.remove(path)
+        print(f"{len(moved) + len(orphans)} file lama dihapus")
+
+    removed = gc(conn)
+    print(f"{len(removed)} blob tanpa referensi dihapus")
+
+
+if __name__ == "__main__":
+    main()
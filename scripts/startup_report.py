@@ -0,0 +1,115 @@
+"""
+Laporan cold start: waktu import per halaman (python -X importtime) dan,
+opsional, waktu run pertama tiap halaman lewat streamlit AppTest.
+
+    python scripts/startup_report.py
+    python scripts/startup_report.py --pages --top 8
+"""
+import argparse
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# apa yang diimpor app.py sebelum halaman dipilih, lalu modul tiap halaman
+TARGETS = [
+    ("app (shell)", "import streamlit, db, auth, chat"),
+    ("📖 reader", "import views.reader"),
+    ("✍️ editor", "import views.editor"),
+    ("👤 profile", "import views.profile"),
+    ("👥 users", "import views.users"),
+    ("💬 chat", "import chat; import storage, attachments, thumbs, pandas"),
+]
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+LOCAL = {os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(ROOT, "*.py"))}
+LOCAL.add("views")
+
+
+def sandbox_env(tmp):
+    """Modul aplikasi membuka DB saat diimpor → pakai salinan, jangan DB asli."""
+    db_path = os.path.join(tmp, "knowledgebase.db")
+    shutil.copy(os.path.join(ROOT, "knowledgebase.db"), db_path)
+    env = dict(os.environ, DB_PATH=db_path)
+    env.pop("DATABASE_URL", None)
+    # migrasi dulu supaya tidak ikut terukur di target pertama
+    subprocess.run([sys.executable, "-c", "import db; db.get_db()"],
+                   cwd=ROOT, env=env, check=True, capture_output=True)
+    return env
+
+
+def importtime(code, env):
+    """(total ms, [(cumulative ms, paket pihak ketiga)]) untuk satu proses baru."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    total, packages = 0, []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        ms, name = int(m.group(2)) / 1000, m.group(4)
+        # indentasi 1 spasi = diimpor langsung oleh kode → jumlahnya = total
+        if len(m.group(3)) == 1:
+            total += ms
+        if "." not in name and name not in LOCAL and not name.startswith("_"):
+            packages.append((ms, name))
+    return total, sorted(packages, reverse=True)
+
+
+def first_run(menu, env):
+    """Detik untuk run pertama halaman di proses baru (login sebagai admin)."""
+    code = textwrap.dedent(f"""
+        import time
+        from streamlit.testing.v1 import AppTest
+        at = AppTest.from_file({os.path.join(ROOT, "app.py")!r}, default_timeout=120)
+        at.session_state["login"] = True
+        at.session_state["user"] = "admin"
+        at.session_state["role"] = "admin"
+        started = time.perf_counter()
+        at.run()
+        radio = at.sidebar.radio[0]
+        radio.set_value([o for o in radio.options if o.startswith({menu!r})][0]).run()
+        print(time.perf_counter() - started, len(at.exception))
+    """)
+    proc = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    seconds, errors = proc.stdout.strip().splitlines()[-1].split()
+    return float(seconds), int(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top", type=int, default=5, help="paket terberat per target")
+    parser.add_argument("--pages", action="store_true", help="ukur juga run pertama tiap halaman")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = sandbox_env(tmp)
+
+        print(f"{'target':<16}{'import ms':>10}  paket terberat (ms kumulatif)")
+        for name, code in TARGETS:
+            total, top = importtime(code, env)
+            heavy = ", ".join(f"{pkg} {ms:.0f}" for ms, pkg in top[:args.top])
+            print(f"{name:<16}{total:>10.0f}  {heavy}")
+
+        if args.pages:
+            print(f"\n{'halaman':<16}{'run pertama s':>14}{'error':>7}")
+            for name, _ in TARGETS[1:]:
+                seconds, errors = first_run(name.split()[0], env)
+                print(f"{name:<16}{seconds:>14.2f}{errors:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,429 @@
+import atexit
+import os
+import pickle
+import re
+import threading
+
+import numpy as np
+from scipy import sparse
+
+from cache import LRUCache, bump_corpus_version, corpus_version
+from db import is_postgres
+
+INDEX_PATH = "search_index.pkl"
+INDEX_FORMAT = 4   # naikkan kalau isi/bentuk file index berubah (4: satu matriks CSR)
+INDEX_SAVE_DELAY = float(os.getenv("INDEX_SAVE_DELAY", "5"))   # detik, debounce tulis ke disk
+DELTA_MAX_ROWS = 512   # baris baru digabung ke matriks utama setelah sebanyak ini
+
+# refit vocabulary kalau dokumen yang di-transform setelah fit > 20% korpus
+REFIT_RATIO = 0.2
+
+# "auto" | "fts" | "tfidf"
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_RERANK = os.getenv("SEARCH_RERANK", "0") == "1"
+SEARCH_TOP_K = 10
+# kandidat re-rank: pool tetap (tidak ikut offset) supaya urutan antar halaman konsisten
+RERANK_POOL = int(os.getenv("SEARCH_RERANK_POOL", str(SEARCH_TOP_K * 5)))
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+
+# hasil search per (query ternormalisasi, k, offset, versi korpus)
+search_cache = LRUCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL)
+
+
+def article_text(title, content_text):
+    return f"{title or ''} {content_text or ''}"
+
+
+# ======================================================
+# TF-IDF INDEX (persistent, incremental)
+# ======================================================
+def _fit(rows):
+    """(vectorizer, ids, matrix CSR) dari baris (id, title, content_text)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer   # berat, hanya saat fit
+
+    if not rows:
+        return None, np.empty(0, dtype=np.int64), None
+    vectorizer = TfidfVectorizer()
+    matrix = vectorizer.fit_transform([article_text(r[1], r[2]) for r in rows]).tocsr()
+    return vectorizer, np.array([int(r[0]) for r in rows], dtype=np.int64), matrix
+
+
+class SearchIndex:
+    """
+    Satu matriks CSR + array id. Artikel baru/diubah masuk ke delta kecil
+    dan baris lamanya ditandai mati; delta digabung ke matriks sesekali.
+    Simpan ke disk di-debounce, refit vocabulary jalan di thread sendiri.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.lock = threading.RLock()
+        self.vectorizer = None
+        self.version = 0
+        self.stale = 0
+        self._reset(np.empty(0, dtype=np.int64), None)
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._refitting = False
+        self._replay = None   # perubahan selama refit → diterapkan ulang ke index baru
+
+    def _reset(self, ids, matrix, alive=None):
+        self.ids = ids            # id artikel per baris matrix
+        self.matrix = matrix      # CSR (n x vocab), None kalau korpus kosong
+        # baris gabungan: 0..n-1 di matrix, n.. di delta
+        self.alive = np.ones(len(ids), dtype=bool) if alive is None else alive
+        self.delta_ids = []
+        self.delta_rows = []
+        self._delta = None
+        self.row_of = {
+            int(i): r for r, i in enumerate(ids.tolist()) if self.alive[r]
+        }
+
+    # ---------- build ----------
+    def build(self, conn):
+        rows = conn.execute("SELECT id, title, content_text FROM articles").fetchall()
+        vectorizer, ids, matrix = _fit(rows)
+        with self.lock:
+            self.vectorizer = vectorizer
+            self._reset(ids, matrix)
+            self.stale = 0
+            self.version += 1
+            replay, self._replay = self._replay, None
+            for op in replay or ():
+                self._apply(*op)
+        self.schedule_save()
+
+    def refit_async(self, conn):
+        with self.lock:
+            if self._refitting:
+                return
+            self._refitting = True
+            self._replay = []
+        threading.Thread(
+            target=self._refit, args=(conn,), name="search-refit", daemon=True
+        ).start()
+
+    def _refit(self, conn):
+        try:
+            self.build(conn)
+            bump_corpus_version()   # skor berubah → cache hasil search lama tidak valid
+        except Exception as e:
+            print("SEARCH refit gagal:", e)
+            with self.lock:
+                self._replay = None
+        finally:
+            conn.close()   # thread selesai → kembalikan koneksinya ke pool
+            self._refitting = False
+
+    def signature(self):
+        return (len(self.row_of), max(self.row_of, default=None))
+
+    def needs_refit(self):
+        return self.stale > REFIT_RATIO * max(len(self.row_of), 1)
+
+    # ---------- mutasi ----------
+    def upsert(self, article_id, title, content_text):
+        self._change("upsert", int(article_id), article_text(title, content_text))
+
+    def remove(self, article_id):
+        self._change("remove", int(article_id), None)
+
+    def _change(self, op, article_id, text):
+        with self.lock:
+            if self._replay is not None:
+                self._replay.append((op, article_id, text))
+            if not self._apply(op, article_id, text):
+                return
+        self.schedule_save()
+
+    def _apply(self, op, article_id, text):
+        if op == "remove":
+            r = self.row_of.pop(article_id, None)
+            if r is None:
+                return False
+            self.alive[r] = False
+            self.stale += 1
+            self.version += 1
+            return True
+
+        self.stale += 1
+        if self.vectorizer is None:
+            # korpus masih kosong → tunggu refit berikutnya
+            return False
+        r = self.row_of.get(article_id)
+        if r is not None:
+            self.alive[r] = False
+        self.row_of[article_id] = len(self.alive)
+        self.alive = np.append(self.alive, True)
+        self.delta_ids.append(article_id)
+        self.delta_rows.append(self.vectorizer.transform([text]).tocsr())
+        self._delta = None
+        if len(self.delta_rows) >= DELTA_MAX_ROWS:
+            self._merge()
+        self.version += 1
+        return True
+
+    def _merge(self):
+        if not self.delta_rows:
+            return
+        parts = [self.matrix] if self.matrix is not None else []
+        self.matrix = sparse.vstack(parts + self.delta_rows, format="csr")
+        self.ids = np.concatenate([self.ids, np.asarray(self.delta_ids, dtype=np.int64)])
+        self.delta_ids, self.delta_rows, self._delta = [], [], None
+
+    # ---------- query ----------
+    def _delta_matrix(self):
+        if self._delta is None and self.delta_rows:
+            self._delta = sparse.vstack(self.delta_rows, format="csr")
+        return self._delta
+
+    def score_array(self, q, ids=None):
+        """(ids, skor cosine) sebagai array; baris TF-IDF sudah ternormalisasi L2."""
+        empty = np.empty(0, dtype=np.int64), np.empty(0)
+        with self.lock:
+            if self.vectorizer is None or not self.row_of:
+                return empty
+            vec = self.vectorizer.transform([q]).T
+            delta = self._delta_matrix()
+            n = len(self.ids)
+
+            if ids is None:
+                parts = [(self.matrix @ vec).toarray().ravel()]
+                all_ids = self.ids
+                if delta is not None:
+                    parts.append((delta @ vec).toarray().ravel())
+                    all_ids = np.concatenate([all_ids, np.asarray(self.delta_ids, dtype=np.int64)])
+                alive = self.alive
+                return all_ids[alive], np.concatenate(parts)[alive]
+
+            # re-rank: hanya baris kandidat
+            rows = [self.row_of[int(i)] for i in ids if int(i) in self.row_of]
+            if not rows:
+                return empty
+            main = [r for r in rows if r < n]
+            extra = [r - n for r in rows if r >= n]
+            out_ids, parts = [], []
+            if main:
+                out_ids.append(self.ids[main])
+                parts.append((self.matrix[main] @ vec).toarray().ravel())
+            if extra:
+                out_ids.append(np.asarray(self.delta_ids, dtype=np.int64)[extra])
+                parts.append((delta[extra] @ vec).toarray().ravel())
+        return np.concatenate(out_ids), np.concatenate(parts)
+
+    def scores(self, q, ids=None):
+        ids, score = self.score_array(q, ids)
+        return dict(zip(ids.tolist(), score.tolist()))
+
+    # ---------- persist ----------
+    def schedule_save(self, delay=INDEX_SAVE_DELAY):
+        """Tulis ke disk di thread timer; perubahan beruntun jadi satu tulisan."""
+        with self.lock:
+            if self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(delay, self.save)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def flush(self):
+        with self.lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+            self.save()
+
+    def save(self):
+        with self.lock:
+            self._save_timer = None
+            self._merge()
+            # matrix/ids diganti (tidak diubah in-place) → aman di-pickle di luar lock
+            state = {
+                "format": INDEX_FORMAT,
+                "vectorizer": self.vectorizer,
+                "ids": self.ids,
+                "matrix": self.matrix,
+                "alive": self.alive.copy(),
+                "version": self.version,
+                "stale": self.stale,
+            }
+        with self._save_lock:
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.path)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print("SEARCH INDEX rusak, rebuild:", e)
+            return False
+        if state.get("format") != INDEX_FORMAT:
+            return False
+        with self.lock:
+            self.vectorizer = state["vectorizer"]
+            self._reset(state["ids"], state["matrix"], state["alive"])
+            self.version = state["version"]
+            self.stale = state["stale"]
+        return True
+
+
+def corpus_signature(conn):
+    count, max_id = conn.execute(
+        "SELECT COUNT(*), MAX(id) FROM articles"
+    ).fetchone()
+    return (count, max_id)
+
+
+# ======================================================
+# INDEX PER PROSES
+# ======================================================
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index(conn):
+    global _index
+    with _index_lock:
+        if _index is None:
+            index = SearchIndex()
+            if not index.load() or index.signature() != corpus_signature(conn):
+                index.build(conn)
+            atexit.register(index.flush)
+            _index = index
+    if _index.needs_refit():
+        # vocabulary basi: refit di thread latar, query tetap pakai index sekarang
+        _index.refit_async(conn)
+    return _index
+
+
+def normalize_query(q):
+    return " ".join((q or "").lower().split())
+
+
+# index TF-IDF selalu dipakai summary (vocabulary + versi), apapun backend search
+def on_article_saved(conn, article_id, title, content_text):
+    bump_corpus_version()
+    get_index(conn).upsert(article_id, title, content_text)
+
+
+def on_article_deleted(conn, article_id):
+    bump_corpus_version()
+    get_index(conn).remove(article_id)
+
+
+# ======================================================
+# BACKEND
+# ======================================================
+def query_terms(q):
+    return re.findall(r"\w+", (q or "").lower())
+
+
+def top_k(ids, score, k, offset=0):
+    """Hit ke-offset..offset+k tanpa sort penuh; skor 0 dibuang."""
+    nz = np.flatnonzero(score > 0)
+    n = offset + k
+    if len(nz) > n:
+        nz = nz[np.argpartition(-score[nz], n - 1)[:n]]
+    order = nz[np.argsort(-score[nz], kind="stable")][offset:n]
+    return list(zip(ids[order].tolist(), score[order].tolist()))
+
+
+class TfidfBackend:
+    name = "tfidf"
+
+    def top(self, conn, q, k, offset=0):
+        ids, score = get_index(conn).score_array(q)
+        return top_k(ids, score, k, offset)
+
+
+class Fts5Backend:
+    name = "fts"
+
+    def top(self, conn, q, k, offset=0):
+        terms = query_terms(q)
+        if not terms:
+            return []
+        # OR antar kata, kata terakhir prefix (ketik sambil cari)
+        match = " OR ".join(f'"{t}"' for t in terms[:-1])
+        match = f'{match} OR "{terms[-1]}"*' if match else f'"{terms[-1]}"*'
+        rows = conn.execute("""
+            SELECT rowid, -bm25(articles_fts, 10.0, 1.0) AS score
+            FROM articles_fts
+            WHERE articles_fts MATCH ?
+            ORDER BY score DESC
+            LIMIT ? OFFSET ?
+        """, (match, k, offset)).fetchall()
+        return [(int(r[0]), float(r[1])) for r in rows]
+
+
+class PostgresBackend:
+    name = "fts"
+
+    def top(self, conn, q, k, offset=0):
+        terms = query_terms(q)
+        if not terms:
+            return []
+        tsquery = " | ".join(terms[:-1] + [f"{terms[-1]}:*"])
+        rows = conn.fetchall("""
+            SELECT id, ts_rank_cd(search_vector, query) AS score
+            FROM articles, to_tsquery('simple', ?) query
+            WHERE search_vector @@ query
+            ORDER BY score DESC
+            LIMIT ? OFFSET ?
+        """, (tsquery, k, offset))
+        return [(int(r[0]), float(r[1])) for r in rows]
+
+
+def has_fts_sqlite(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name='articles_fts'"
+    ).fetchone() is not None
+
+
+_backend = None
+
+
+def get_backend(conn):
+    global _backend
+    if _backend is None:
+        if SEARCH_BACKEND == "tfidf":
+            _backend = TfidfBackend()
+        elif is_postgres(conn):
+            _backend = PostgresBackend()
+        elif has_fts_sqlite(conn):
+            _backend = Fts5Backend()
+        else:
+            _backend = TfidfBackend()
+    return _backend
+
+
+def search(conn, q, k=SEARCH_TOP_K, offset=0, rerank=SEARCH_RERANK):
+    """Top-k (article id, score) dari backend; TF-IDF cosine opsional sebagai re-ranker."""
+    backend = get_backend(conn)
+    if not rerank or backend.name == "tfidf":
+        return backend.top(conn, q, k, offset)
+
+    pool = search_cache.get_or_set(
+        ("rerank", normalize_query(q), corpus_version()),
+        lambda: _rerank_pool(conn, backend, q)
+    )
+    hits = pool[offset:offset + k]
+    if len(hits) < k and len(pool) == RERANK_POOL:
+        # di luar pool: lanjut urutan backend, tanpa re-rank
+        start = max(offset, RERANK_POOL)
+        hits += backend.top(conn, q, k - len(hits), start)
+    return hits
+
+
+def _rerank_pool(conn, backend, q):
+    """RERANK_POOL hit teratas backend, diurutkan ulang sekali dengan cosine TF-IDF."""
+    hits = backend.top(conn, q, RERANK_POOL)
+    cosine = get_index(conn).scores(q, [h[0] for h in hits])
+    hits.sort(key=lambda h: (cosine.get(h[0], 0.0), h[1]), reverse=True)
+    return hits
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+BLOB_DIR = "uploads/blobs"
+CHUNK_SIZE = 1024 * 1024
+GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+# kolom yang menyimpan path file (chart_config.csv dibaca terpisah, isinya JSON)
+REF_COLUMNS = [
+    ("articles", "attachment"),
+    ("chat", "attachment"),
+    ("users", "avatar"),
+]
+
+_LEGACY_PREFIX = re.compile(r"^\d+(\.\d+)?_")
+
+
+def blob_path(digest, name):
+    ext = os.path.splitext(name)[1].lower()
+    return os.path.join(BLOB_DIR, digest[:2], f"{digest}{ext}")
+
+
+def original_name(path):
+    """Nama file tanpa prefix timestamp upload lama."""
+    return _LEGACY_PREFIX.sub("", os.path.basename(path))
+
+
+# ======================================================
+# SIMPAN (stream per chunk sambil hash, satu file per isi)
+# ======================================================
+def store(conn, fileobj, name):
+    """Simpan isi fileobj sekali per hash; return path blob-nya."""
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    if hasattr(fileobj, "seek"):
+        fileobj.seek(0)
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=BLOB_DIR, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                out.write(chunk)
+                size += len(chunk)
+        digest = digest.hexdigest()
+
+        row = conn.fetchone("SELECT path FROM blobs WHERE hash=?", (digest,))
+        if row and os.path.exists(row[0]):
+            return row[0]
+
+        path = blob_path(digest, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp, path)
+        tmp = None
+
+        conn.execute("""
+            INSERT INTO blobs (hash, path, name, size, mime, refs, created_at)
+            VALUES (?, ?, ?, ?, ?, 0, ?)
+            ON CONFLICT (hash) DO UPDATE SET path=excluded.path
+        """, (
+            digest, path, name, size,
+            mimetypes.guess_type(name)[0] or "application/octet-stream",
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ))
+        conn.commit()
+        return path
+    finally:
+        if tmp and os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# ======================================================
+# REFERENSI + GARBAGE COLLECTION
+# ======================================================
+def references(conn):
+    """Counter path → jumlah baris yang memakainya."""
+    refs = Counter()
+    for table, column in REF_COLUMNS:
+        for r in conn.iter_rows(
+            f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL AND {column} != ''"
+        ):
+            refs[r[0]] += 1
+
+    for r in conn.iter_rows(
+        "SELECT chart_config FROM articles WHERE chart_config IS NOT NULL"
+    ):
+        try:
+            csv_path = json.loads(r[0]).get("csv")
+        except (TypeError, ValueError, AttributeError):
+            continue
+        if csv_path:
+            refs[csv_path] += 1
+    return refs
+
+
+def gc(conn, grace=GC_GRACE_SECONDS):
+    """Perbarui refs setiap blob lalu hapus blob tanpa referensi; return path terhapus."""
+    from charts import columns_dir
+
+    refs = references(conn)
+    blobs = conn.fetchall("SELECT hash, path, created_at FROM blobs")
+    conn.executemany(
+        "UPDATE blobs SET refs=? WHERE hash=?",
+        [(refs.get(b[1], 0), b[0]) for b in blobs]
+    )
+
+    # upload yang belum sempat di-commit ke tabelnya jangan ikut terhapus
+    cutoff = (datetime.now() - timedelta(seconds=grace)).strftime("%Y-%m-%d %H:%M:%S")
+    removed = []
+    for digest, path, created_at in blobs:
+        if refs.get(path) or (created_at or "") > cutoff:
+            continue
+        conn.execute("DELETE FROM blobs WHERE hash=?", (digest,))
+        if os.path.exists(path):
+            os.remove(path)
+        shutil.rmtree(columns_dir(path), ignore_errors=True)
+        removed.append(path)
+    conn.commit()
+    return removed
+
+
+if __name__ == "__main__":
+    # python storage.py → hapus blob yang tidak dipakai lagi
+    from db import get_db
+
+    removed = gc(get_db())
+    for path in removed:
+        print("GC", path)
+    print(f"{len(removed)} blob dihapus")
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# modul aplikasi membuka DB saat diimpor → arahkan ke DB sementara, bukan knowledgebase.db
+_tmp = tempfile.mkdtemp(prefix="kb_test_")
+os.environ["DB_PATH"] = os.path.join(_tmp, "knowledgebase.db")
+os.environ.pop("DATABASE_URL", None)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
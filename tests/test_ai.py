@@ -0,0 +1,9 @@
+from ai import split_sentences
+
+
+def test_sentences_keep_plain_text_symbols():
+    text = "Pakai C# untuk modul snake_case ini. Batas x < 1 y > 2 harus tetap utuh!"
+    assert split_sentences([text], min_len=10) == [
+        "Pakai C# untuk modul snake_case ini.",
+        "Batas x < 1 y > 2 harus tetap utuh!",
+    ]
@@ -0,0 +1,22 @@
+from articles import derive_fields, sanitize_html
+
+
+def test_soft_line_break_rendered_once():
+    html = derive_fields("baris satu\nbaris dua")["content_html"]
+    assert html.count("<br>") == 1
+    assert "</br>" not in html
+
+
+def test_void_tags_have_no_end_tag():
+    assert sanitize_html('<p>a<br/>b<hr /><img src="x.png"></p>') == \
+        '<p>a<br>b<hr><img src="x.png"></p>'
+
+
+def test_plain_text_keeps_prose_symbols():
+    d = derive_fields("Pakai **C#** dan `snake_case` > lainnya | x")
+    assert d["content_text"] == "Pakai C# dan snake_case > lainnya | x"
+
+
+def test_plain_text_drops_script():
+    d = derive_fields("halo <script>alert(1)</script> dunia")
+    assert "alert" not in d["content_text"]
@@ -0,0 +1,64 @@
+import sqlite3
+import threading
+
+from db import get_db
+
+
+def run_in_thread(fn):
+    t = threading.Thread(target=fn)
+    t.start()
+    t.join()
+
+
+def test_failed_write_releases_lock():
+    conn = get_db()
+    conn.execute("INSERT INTO users (username, role) VALUES ('pool_dup', 'user')")
+    conn.commit()
+
+    def duplicate():
+        # seperti form tambah user: IntegrityError ditangkap, tanpa rollback
+        try:
+            conn.execute("INSERT INTO users (username, role) VALUES ('pool_dup', 'user')")
+        except sqlite3.IntegrityError:
+            pass
+
+    in_transaction = []
+
+    def next_request():
+        conn.fetchall("SELECT username FROM users")
+        in_transaction.append(conn.raw.in_transaction)
+
+    run_in_thread(duplicate)
+    run_in_thread(next_request)   # thread baru → koneksi thread mati dikembalikan ke pool
+
+    assert in_transaction == [False]
+    conn.execute("UPDATE users SET bio='ok' WHERE username='pool_dup'")
+    conn.commit()
+    assert get_db().manager.stats()["rolled_back"] >= 1
+
+
+def test_slow_connect_does_not_block_pool(monkeypatch):
+    import time
+
+    import db
+
+    manager = db.ConnectionManager(size=4)
+    manager.init()
+    manager.connection()   # koneksi idle dari init dipakai thread ini
+
+    real_connect = db.connect_sqlite
+
+    def slow_connect(*args, **kwargs):
+        time.sleep(0.5)
+        return real_connect(*args, **kwargs)
+
+    monkeypatch.setattr(db, "connect_sqlite", slow_connect)
+    other = threading.Thread(target=manager.connection)
+    other.start()
+    time.sleep(0.1)   # thread lain sedang membuka koneksi baru
+
+    started = time.monotonic()
+    manager.release()
+    assert time.monotonic() - started < 0.2
+    other.join()
+    assert manager.stats()["in_use"] == 1
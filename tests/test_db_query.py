@@ -0,0 +1,91 @@
+from db import Database
+
+
+class FakeCursor:
+    def __init__(self):
+        self.calls = []
+
+    def execute(self, sql, params):
+        self.calls.append((sql, params))
+
+
+class FakeManager:
+    backend = "postgres"
+
+    def __init__(self):
+        self.cur = FakeCursor()
+
+    def connection(self):
+        return self
+
+    def cursor(self, **kwargs):
+        return self.cur
+
+
+def test_execute_escapes_percent_only_with_params():
+    manager = FakeManager()
+    db = Database(manager)
+
+    db.execute("SELECT * FROM t WHERE a LIKE 'x%'")
+    db.execute("SELECT * FROM t WHERE a LIKE 'x%' AND b=?", (1,))
+
+    assert manager.cur.calls == [
+        ("SELECT * FROM t WHERE a LIKE 'x%'", None),
+        ("SELECT * FROM t WHERE a LIKE 'x%%' AND b=%s", (1,)),
+    ]
+
+
+class FakeNamedCursor(FakeCursor):
+    def __init__(self, rows):
+        super().__init__()
+        self.rows = list(rows)
+        self.closed = False
+
+    def fetchmany(self, n):
+        out, self.rows = self.rows[:n], self.rows[n:]
+        return out
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+class FakeTxManager(FakeManager):
+    def __init__(self, rows):
+        self.cur = FakeNamedCursor(rows)
+        self.autocommit = True
+        self.cursor_kwargs = None
+        self.log = []
+
+    def cursor(self, **kwargs):
+        self.cursor_kwargs = kwargs
+        self.log.append(("cursor", self.autocommit))
+        return self.cur
+
+    def commit(self):
+        self.log.append("commit")
+
+    def rollback(self):
+        self.log.append("rollback")
+
+
+def test_iter_rows_streams_inside_transaction_without_hold():
+    manager = FakeTxManager(range(5))
+    db = Database(manager)
+
+    assert list(db.iter_rows("SELECT x FROM t WHERE y=?", (1,), chunk=2)) == [0, 1, 2, 3, 4]
+    assert "withhold" not in manager.cursor_kwargs
+    assert manager.log == [("cursor", False), "commit"]
+    assert manager.cur.closed and manager.autocommit
+
+
+def test_iter_rows_rolls_back_when_abandoned():
+    manager = FakeTxManager(range(5))
+    db = Database(manager)
+
+    it = db.iter_rows("SELECT x FROM t", chunk=2)
+    next(it)
+    it.close()
+    assert manager.log[-1] == "rollback" and manager.autocommit
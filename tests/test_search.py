@@ -0,0 +1,117 @@
+import time
+
+import pytest
+
+from db import get_db
+import search
+from search import SearchIndex
+
+DOCS = {
+    "kucing": "kucing tidur di atas sofa sepanjang hari",
+    "server": "server database dimigrasi ke cluster baru",
+    "resep": "resep nasi goreng dengan telur dan kecap",
+}
+
+
+@pytest.fixture
+def conn():
+    conn = get_db()
+    conn.execute("DELETE FROM articles")
+    for title, text in DOCS.items():
+        conn.execute(
+            "INSERT INTO articles (title, content, content_text) VALUES (?, ?, ?)",
+            (title, text, text)
+        )
+    conn.commit()
+    yield conn
+    conn.execute("DELETE FROM articles")
+    conn.commit()
+
+
+def ids_by_title(conn):
+    return {r[1]: r[0] for r in conn.execute("SELECT id, title FROM articles").fetchall()}
+
+
+def top(index, q):
+    ids, score = index.score_array(q)
+    return {i for i, s in zip(ids.tolist(), score.tolist()) if s > 0}
+
+
+def test_upsert_and_remove_without_rebuild(conn, tmp_path):
+    index = SearchIndex(str(tmp_path / "index.pkl"))
+    index.build(conn)
+    ids = ids_by_title(conn)
+
+    assert top(index, "database") == {ids["server"]}
+
+    # artikel diubah: baris lama mati, baris baru di delta
+    index.upsert(ids["resep"], "resep", "resep database rahasia")
+    assert top(index, "database") == {ids["server"], ids["resep"]}
+    assert index.scores("database", [ids["resep"]]).keys() == {ids["resep"]}
+
+    index.remove(ids["server"])
+    assert top(index, "database") == {ids["resep"]}
+    assert index.signature()[0] == 2
+
+
+def test_save_load_roundtrip(conn, tmp_path):
+    path = str(tmp_path / "index.pkl")
+    index = SearchIndex(path)
+    index.build(conn)
+    ids = ids_by_title(conn)
+    index.upsert(ids["kucing"], "kucing", "kucing tidur di server")
+    index.flush()
+
+    loaded = SearchIndex(path)
+    assert loaded.load()
+    assert top(loaded, "server") == top(index, "server")
+    assert loaded.signature() == index.signature()
+
+
+def test_refit_in_background_keeps_concurrent_changes(conn, tmp_path):
+    index = SearchIndex(str(tmp_path / "index.pkl"))
+    index.build(conn)
+    ids = ids_by_title(conn)
+    version = index.version
+
+    index.refit_async(conn)
+    index.upsert(ids["kucing"], "kucing", "kucing database")   # selama refit
+    deadline = time.monotonic() + 10
+    while index._refitting and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert index.version > version
+    assert ids["kucing"] in top(index, "database")
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(self, n):
+        self.hits = [(i, float(n - i)) for i in range(n)]
+        self.calls = []
+
+    def top(self, conn, q, k, offset=0):
+        self.calls.append((k, offset))
+        return self.hits[offset:offset + k]
+
+
+class ReversedIndex:
+    def scores(self, q, ids):
+        return {i: float(i) for i in ids}
+
+
+def test_rerank_pages_share_one_pool(monkeypatch):
+    search.search_cache.clear()
+    backend = FakeBackend(50)
+    monkeypatch.setattr(search, "RERANK_POOL", 20)
+    monkeypatch.setattr(search, "get_backend", lambda conn: backend)
+    monkeypatch.setattr(search, "get_index", lambda conn: ReversedIndex())
+
+    pages = [search.search(None, "q", 10, offset, rerank=True) for offset in (0, 10, 20, 30)]
+
+    ids = [h[0] for page in pages for h in page]
+    assert ids[:20] == list(range(19, -1, -1))     # pool di-re-rank sekali
+    assert ids[20:] == list(range(20, 40))         # di luar pool: urutan backend
+    assert backend.calls[0] == (20, 0)
+    assert (20, 0) not in backend.calls[1:]
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+import translate
+from db import get_db
+from translate import FakeBackend, set_backend, translation
+
+
+class FailingBackend:
+    name = "failing"
+
+    def __init__(self):
+        self.calls = 0
+
+    def translate_batch(self, chunks, target):
+        self.calls += 1
+        raise RuntimeError("backend mati")
+
+
+@pytest.fixture
+def backend():
+    yield
+    set_backend(None)
+    translate._memo.clear()
+
+
+def poll(text, times, interval=0.05):
+    conn = get_db()
+    statuses = []
+    for _ in range(times):
+        statuses.append(translation(conn, text, "en"))
+        time.sleep(interval)
+    return statuses
+
+
+def wait_result(text, timeout=5):
+    conn = get_db()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, result = translation(conn, text, "en")
+        if status != "pending":
+            return status, result
+        time.sleep(0.05)
+    raise AssertionError("terjemahan tidak selesai")
+
+
+def test_polls_share_one_job(backend):
+    fake = FakeBackend(delay=0.5)
+    set_backend(fake)
+    text = "Polling berulang hanya satu job."
+
+    statuses = poll(text, 5)
+
+    assert [s for s, _ in statuses] == ["pending"] * 5
+    assert wait_result(text) == ("done", f"[en] {text}")
+    assert fake.calls == 1
+    # berikutnya dari cache, backend tidak dipanggil lagi
+    assert translation(get_db(), text, "en") == ("done", f"[en] {text}")
+    assert fake.calls == 1
+
+
+def test_backend_error_is_reported(backend):
+    failing = FailingBackend()
+    set_backend(failing)
+    text = "Backend yang gagal harus jadi error."
+
+    status, result = wait_result(text)
+
+    assert status == "error"
+    assert "backend mati" in result
+    assert failing.calls == 1
+
+    # error tidak di-cache: permintaan berikutnya mencoba ulang sekali
+    assert wait_result(text)[0] == "error"
+    assert failing.calls == 2
@@ -0,0 +1,88 @@
+import functools
+import hashlib
+import os
+import threading
+
+from cache import LRUCache, evict
+from storage import BLOB_DIR
+
+THUMB_DIR = "uploads/cache/thumbs"
+THUMB_CACHE_MAX_BYTES = int(os.getenv("THUMB_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+THUMB_QUALITY = 80
+
+# lebar tampilan (px) dibulatkan ke atas ke bucket ini, x2 untuk layar HiDPI
+SIZE_BUCKETS = (64, 128, 320, 640, 1280)
+
+_lock = threading.Lock()
+_hash_cache = LRUCache(maxsize=4096)
+
+
+def bucket(width):
+    for size in SIZE_BUCKETS:
+        if size >= width * 2:
+            return size
+    return SIZE_BUCKETS[-1]
+
+
+def source_hash(path):
+    """Hash isi file sumber; blob store sudah menamai file dengan hash-nya."""
+    if path.startswith(BLOB_DIR):
+        return os.path.splitext(os.path.basename(path))[0]
+
+    st = os.stat(path)
+
+    def digest():
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    return _hash_cache.get_or_set((path, st.st_size, st.st_mtime_ns), digest)
+
+
+@functools.lru_cache(maxsize=None)
+def thumb_format():
+    from PIL import features
+
+    return "WEBP" if features.check("webp") else "JPEG"
+
+
+def _render(src, dest, size):
+    from PIL import Image, ImageOps   # Pillow dimuat saat thumbnail pertama dibuat
+
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail((size, size))
+        if thumb_format() == "JPEG" and img.mode != "RGB":
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA")
+        tmp = f"{dest}.tmp"
+        img.save(tmp, format=thumb_format(), quality=THUMB_QUALITY)
+    os.replace(tmp, dest)
+
+
+def thumbnail(path, width):
+    """Path thumbnail untuk tampilan selebar `width`; original hanya untuk download."""
+    size = bucket(width)
+    ext = "webp" if thumb_format() == "WEBP" else "jpg"
+    dest = os.path.join(THUMB_DIR, f"{source_hash(path)}_{size}.{ext}")
+    try:
+        os.utime(dest)   # tandai baru dipakai → eviction (urut mtime) jadi LRU
+        return dest
+    except FileNotFoundError:
+        pass
+
+    with _lock:
+        if os.path.exists(dest):
+            return dest
+        os.makedirs(THUMB_DIR, exist_ok=True)
+        try:
+            _render(path, dest, size)
+        except Exception as e:
+            # file rusak / bukan gambar: tampilkan apa adanya
+            print("THUMBNAIL gagal:", path, e)
+            return path
+        evict(THUMB_DIR, THUMB_CACHE_MAX_BYTES)
+    return dest
@@ -0,0 +1,172 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from cache import LRUCache
+from db import get_db
+
+TRANSLATE_BACKEND = os.getenv("TRANSLATE_BACKEND", "google")   # google | fake
+TRANSLATE_WORKERS = int(os.getenv("TRANSLATE_WORKERS", "2"))
+TRANSLATE_CHUNK_CHARS = 4500   # batas Google 5000 karakter per request
+FAKE_TRANSLATE_DELAY = float(os.getenv("FAKE_TRANSLATE_DELAY", "0"))
+
+SENT_RE = re.compile(r"(?<=[.!?])\s+")
+PARA_RE = re.compile(r"\n\s*\n")
+
+
+# ======================================================
+# BACKEND (bisa diganti; fake untuk test & benchmark offline)
+# ======================================================
+class GoogleBackend:
+    name = "google"
+
+    def translate_batch(self, chunks, target):
+        from deep_translator import GoogleTranslator
+
+        translator = GoogleTranslator(source="auto", target=target)
+        return [translator.translate(c) or "" for c in chunks]
+
+
+class FakeBackend:
+    name = "fake"
+
+    def __init__(self, delay=FAKE_TRANSLATE_DELAY):
+        self.delay = delay
+        self.calls = 0
+
+    def translate_batch(self, chunks, target):
+        self.calls += 1
+        if self.delay:
+            time.sleep(self.delay * len(chunks))
+        return [f"[{target}] {c}" for c in chunks]
+
+
+BACKENDS = {"google": GoogleBackend, "fake": FakeBackend}
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = BACKENDS[TRANSLATE_BACKEND]()
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+# ======================================================
+# CHUNKING (per kalimat, paragraf dipertahankan)
+# ======================================================
+def _hard_split(sentence, limit):
+    # kalimat super panjang tanpa titik: potong di spasi terdekat
+    while len(sentence) > limit:
+        cut = sentence.rfind(" ", 0, limit)
+        cut = cut if cut > 0 else limit
+        yield sentence[:cut]
+        sentence = sentence[cut:].lstrip()
+    if sentence:
+        yield sentence
+
+
+def chunk_text(text, limit=TRANSLATE_CHUNK_CHARS):
+    """[(pemisah sebelum chunk, chunk)] dengan setiap chunk <= limit karakter."""
+    chunks = []
+    current, current_sep = "", ""
+    for p, para in enumerate(PARA_RE.split(text.strip())):
+        for s, sentence in enumerate(SENT_RE.split(para.strip())):
+            for piece in _hard_split(sentence, limit):
+                sep = "\n\n" if p and not s else " "
+                if current and len(current) + len(sep) + len(piece) <= limit:
+                    current += sep + piece
+                    continue
+                if current:
+                    chunks.append((current_sep, current))
+                current, current_sep = piece, sep
+    if current:
+        chunks.append((current_sep, current))
+    return chunks
+
+
+def translate_text(text, target, backend=None):
+    """Terjemahkan langsung (blocking): satu batch berisi semua chunk."""
+    chunks = chunk_text(text)
+    if not chunks:
+        return ""
+    out = (backend or get_backend()).translate_batch([c for _, c in chunks], target)
+    return "".join(
+        (sep if i else "") + t for i, ((sep, _), t) in enumerate(zip(chunks, out))
+    )
+
+
+# ======================================================
+# CACHE PERSISTEN (tabel translations) + WORKER LATAR BELAKANG
+# ======================================================
+_memo = LRUCache(maxsize=512)
+_pool = ThreadPoolExecutor(max_workers=TRANSLATE_WORKERS, thread_name_prefix="translate")
+_pending = {}   # (hash, target) -> Future
+_lock = threading.Lock()
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def cached(conn, text, target):
+    key = (content_hash(text), target)
+    result = _memo.get(key)
+    if result is None:
+        row = conn.fetchone(
+            "SELECT text FROM translations WHERE content_hash=? AND lang=?", key
+        )
+        if row:
+            result = row[0]
+            _memo.set(key, result)
+    return result
+
+
+def _job(text, target, key):
+    result = translate_text(text, target)
+    conn = get_db()
+    try:
+        conn.execute("""
+            INSERT INTO translations (content_hash, lang, text, backend, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (content_hash, lang) DO UPDATE SET
+                text=excluded.text, backend=excluded.backend, created_at=excluded.created_at
+        """, (*key, result, get_backend().name, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+    finally:
+        conn.close()   # worker hidup lama → kembalikan koneksinya ke pool
+    _memo.set(key, result)
+    with _lock:
+        _pending.pop(key, None)
+    return result
+
+
+def translation(conn, text, target):
+    """(status, hasil): 'done' dari cache, 'pending' saat dikerjakan, 'error' kalau gagal."""
+    result = cached(conn, text, target)
+    if result is not None:
+        return "done", result
+
+    key = (content_hash(text), target)
+    with _lock:
+        future = _pending.get(key)
+        if future is None:
+            future = _pending[key] = _pool.submit(_job, text, target, key)
+
+    if not future.done():
+        return "pending", None
+    with _lock:
+        _pending.pop(key, None)   # error → klik berikutnya mencoba ulang
+    if future.exception():
+        return "error", str(future.exception())
+    return "done", future.result()
@@ -0,0 +1 @@
+"""Satu modul per halaman; diimpor app.py hanya saat halaman dibuka."""
@@ -0,0 +1,187 @@
+import json
+from datetime import datetime
+
+import streamlit as st
+
+from articles import derive_fields
+from attachments import show_attachment, show_content
+from charts import store_columns, csv_sample, preview_png, CSV_MAX_BYTES
+from db import get_db
+from search import on_article_saved, on_article_deleted
+from storage import store
+
+
+
+def _csv_preview(csv_file):
+    """Sample CSV per file upload; rerun karena widget lain tidak mem-parse ulang."""
+    cached = st.session_state.get("csv_sample")
+    if cached is None or cached[0] != csv_file.file_id:
+        cached = st.session_state.csv_sample = (csv_file.file_id, *csv_sample(csv_file))
+    return cached[1], cached[2]
+
+
+def my_articles_page():
+    conn = get_db()
+    st.subheader("✍️ Tambah Artikel")
+
+    title = st.text_input("Judul Artikel")
+
+    font_family = st.selectbox(
+        "Font Artikel",
+        ["Default", "Serif", "Monospace"]
+    )
+
+    content = st.text_area(
+        "Isi Artikel (Markdown didukung)",
+        height=260
+    )
+
+    # ================= IMAGE / PDF =================
+    file = st.file_uploader(
+        "Upload Gambar / PDF",
+        type=["png", "jpg", "jpeg", "pdf"]
+    )
+
+    if file and file.type.startswith("image"):
+        st.image(file, width=300)
+
+    # ================= CSV → GRAFIK =================
+    st.divider()
+    st.markdown("### 📊 Grafik dari CSV (Opsional)")
+
+    csv_file = st.file_uploader("Upload CSV", type=["csv"])
+
+    chart_config = None
+
+    if csv_file and csv_file.size > CSV_MAX_BYTES:
+        st.error(f"CSV terlalu besar (maks {CSV_MAX_BYTES // (1024 * 1024)} MB)")
+        csv_file = None
+
+    if not csv_file:
+        st.session_state.pop("csv_sample", None)
+    else:
+        df_csv, truncated = _csv_preview(csv_file)
+        if truncated:
+            st.caption(f"Preview memakai {len(df_csv):,} baris pertama")
+        st.dataframe(df_csv.head(200), use_container_width=True)
+
+        c1, c2, c3, c4 = st.columns(4)
+        with c1:
+            x_col = st.selectbox("Kolom X", df_csv.columns)
+        with c2:
+            y_col = st.selectbox("Kolom Y", df_csv.columns)
+        with c3:
+            chart_type = st.selectbox("Jenis Grafik", ["Line", "Bar", "Area"])
+        with c4:
+            chart_color = st.color_picker("Warna", "#ff5da2")
+
+        chart_config = {
+            "x": x_col,
+            "y": y_col,
+            "type": chart_type,
+            "color": chart_color,
+            "csv": None
+        }
+
+        st.image(preview_png(
+            csv_file.file_id, df_csv[x_col], df_csv[y_col], chart_config
+        ))
+
+    # ================= ✅ TOMBOL SIMPAN (DI LUAR IF CSV) =================
+    if st.button("💾 Simpan Artikel", type="primary"):
+        if not title or not content:
+            st.warning("Judul dan isi wajib diisi")
+            st.stop()
+
+        attach = None
+
+        # ---- SIMPAN GAMBAR / PDF ----
+        if file:
+            attach = store(conn, file, file.name)
+
+            if file.type.startswith("image"):
+                content += f"\n\n![{file.name}]({attach})"
+
+        # ---- SIMPAN CSV ----
+        if csv_file and chart_config:
+            csv_path = store(conn, csv_file, csv_file.name)
+            chart_config["csv"] = csv_path
+            store_columns(csv_path, [chart_config["x"], chart_config["y"]])
+
+        # ---- FONT STYLE ----
+        font_css = ""
+        if font_family == "Serif":
+            font_css = "font-family:serif;"
+        elif font_family == "Monospace":
+            font_css = "font-family:monospace;"
+
+        content = f"<div style='{font_css}'>{content}</div>"
+
+        derived = derive_fields(content)
+
+        article_id = conn.insert("""
+            INSERT INTO articles
+            (title, content, content_html, content_text, snippet, word_count,
+             author, attachment, chart_config, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            title,
+            content,
+            derived["content_html"],
+            derived["content_text"],
+            derived["snippet"],
+            derived["word_count"],
+            st.session_state.user,
+            attach,
+            json.dumps(chart_config) if chart_config else None,
+            datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        ))
+        conn.commit()
+        on_article_saved(conn, article_id, title, derived["content_text"])
+
+        st.success("✅ Artikel berhasil ditambahkan")
+        st.rerun()
+    # =====================================================
+    # ================= LIST ARTIKEL ======================
+    # =====================================================
+    st.divider()
+    st.subheader("📄 Daftar Artikel")
+
+    if st.session_state.role in ["admin", "editor"]:
+        articles = conn.read_df(
+            "SELECT * FROM articles ORDER BY created_at DESC"
+        )
+    else:
+        articles = conn.read_df(
+            "SELECT * FROM articles WHERE author=? ORDER BY created_at DESC",
+            (st.session_state.user,)
+        )
+
+    if articles.empty:
+        st.info("Belum ada artikel")
+    else:
+        for _, a in articles.iterrows():
+            with st.expander(f"{a['title']} — ✍️ {a['author']}"):
+                show_content(a)
+
+                if a["attachment"]:
+                    show_attachment(conn, a["attachment"], key=f"myatt_{a['id']}", preview=False)
+
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    if st.button("✏️ Edit", key=f"edit_{a['id']}"):
+                        st.session_state.edit_article_id = a["id"]
+                        st.session_state.menu = "✍️ Artikel Saya"
+                        st.rerun()
+
+                with col2:
+                    if st.button("🗑️ Delete", key=f"del_{a['id']}"):
+                        conn.execute(
+                            "DELETE FROM articles WHERE id=?",
+                            (a["id"],)
+                        )
+                        conn.commit()
+                        on_article_deleted(conn, a["id"])
+                        st.success("🗑️ Artikel dihapus")
+                        st.rerun()
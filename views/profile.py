@@ -0,0 +1,99 @@
+import os
+
+import streamlit as st
+
+from auth import hash_pw, check_pw
+from db import get_db
+from passwords import AuthBusy
+from storage import store
+from thumbs import thumbnail
+
+
+
+def profile_page():
+    conn = get_db()
+    st.subheader("👤 Profile Saya")
+
+    user = conn.execute(
+        "SELECT * FROM users WHERE username=?",
+        (st.session_state.user,)
+    ).fetchone()
+
+    col1, col2 = st.columns([1, 3])
+    
+    st.divider()
+    st.subheader("🔐 Ganti Password")
+
+    old_pw = st.text_input("Password Lama", type="password")
+    new_pw = st.text_input("Password Baru", type="password")
+    confirm_pw = st.text_input("Konfirmasi Password Baru", type="password")
+
+    if st.button("🔁 Ganti Password"):
+        if not old_pw or not new_pw or not confirm_pw:
+            st.error("Semua field password wajib diisi")
+            st.stop()
+
+        if new_pw != confirm_pw:
+            st.error("Password baru dan konfirmasi tidak sama")
+            st.stop()
+
+        # ambil password lama
+        current = conn.execute(
+            "SELECT password FROM users WHERE username=?",
+            (st.session_state.user,)
+        ).fetchone()
+
+        try:
+            if not check_pw(old_pw, current["password"], st.session_state.user):
+                st.error("Password lama salah")
+                st.stop()
+            new_hash = hash_pw(new_pw, st.session_state.user)
+        except AuthBusy as e:
+            st.warning(f"Server sedang sibuk ({e}), coba lagi sebentar")
+            st.stop()
+
+        # update password
+        conn.execute(
+            "UPDATE users SET password=? WHERE username=?",
+            (new_hash, st.session_state.user)
+        )
+        conn.commit()
+
+        st.success("✅ Password berhasil diganti")
+        st.toast("🔐 Password diperbarui", icon="✨")
+
+
+    # ==== AVATAR ====
+    with col1:
+        if user["avatar"] and os.path.exists(user["avatar"]):
+            st.image(thumbnail(user["avatar"], 150), width=150)
+        else:
+            st.image("https://via.placeholder.com/150", width=150)
+
+        avatar = st.file_uploader(
+            "Upload Avatar",
+            type=["png", "jpg", "jpeg"]
+        )
+
+    # ==== PROFILE FORM ====
+    with col2:
+        name = st.text_input("Nama", user["name"] or "")
+        bio = st.text_area("Bio", user["bio"] or "")
+
+    if st.button("💾 Simpan Profile"):
+        avatar_path = user["avatar"]
+
+        if avatar:
+            # original disimpan apa adanya; tampilan memakai thumbnail
+            ext = os.path.splitext(avatar.name)[1].lower()
+            avatar_path = store(conn, avatar, f"{st.session_state.user}{ext}")
+
+        conn.execute("""
+            UPDATE users
+            SET name=?, bio=?, avatar=?
+            WHERE username=?
+        """, (name, bio, avatar_path, st.session_state.user))
+        conn.commit()
+
+        st.success("Profile berhasil diperbarui")
+        st.rerun()
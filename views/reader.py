@@ -0,0 +1,258 @@
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+from ai import ai_summary, SUMMARY_TOP_K
+from articles import load_reader_data
+from attachments import show_attachment, show_content
+from cache import corpus_version
+from charts import render_chart
+from chat import on_chat_changed
+from db import get_db
+from search import (
+    search, get_index, normalize_query, search_cache, SEARCH_TOP_K
+)
+from translate import translation
+
+TRANSLATE_POLL = 1.5   # detik antar cek hasil terjemahan latar belakang
+
+
+def show_translation(article_id, text, target="en"):
+    conn = get_db()
+    status, result = translation(conn, text, target)
+
+    if status == "pending":
+        st.info("⏳ Menerjemahkan…")
+
+        @st.fragment(run_every=TRANSLATE_POLL)
+        def wait():
+            if translation(conn, text, target)[0] != "pending":
+                st.rerun()
+
+        wait()
+    elif status == "error":
+        st.session_state[f"tr_open_{article_id}"] = False
+        st.error(f"Gagal menerjemahkan: {result}")
+    else:
+        st.markdown("### 🇬🇧 English Version")
+        st.markdown(
+            f"<div style='font-style:italic'>{result}</div>",
+            unsafe_allow_html=True
+        )
+
+
+def search_articles(q, k=SEARCH_TOP_K, offset=0):
+    """Satu halaman hasil (k baris mulai offset) + flag masih ada halaman berikutnya."""
+    q = normalize_query(q)
+    return search_cache.get_or_set(
+        (q, k, offset, corpus_version()),
+        lambda: _search_articles(q, k, offset)
+    )
+
+
+def _search_articles(q, k, offset):
+    conn = get_db()
+    if not q:
+        df = conn.read_df(
+            "SELECT * FROM articles ORDER BY created_at DESC LIMIT ? OFFSET ?",
+            (k + 1, offset)
+        )
+        return df.head(k), None, len(df) > k
+    hits = search(conn, q, k + 1, offset)
+    has_more = len(hits) > k
+    hits = hits[:k]
+    if not hits:
+        return pd.DataFrame(), None, False
+    ids = [h[0] for h in hits]
+    df = conn.read_df(
+        f"SELECT * FROM articles WHERE id IN ({','.join('?' * len(ids))})",
+        ids
+    )
+    df["score"] = df["id"].map(dict(hits))
+    # urutan hits dari search() (bisa hasil re-rank), bukan skor DB
+    rank = {article_id: i for i, article_id in enumerate(ids)}
+    df = df.sort_values("id", key=lambda col: col.map(rank))
+    return df, summarize_query(q), has_more
+
+
+def summarize_query(q):
+    conn = get_db()
+
+    # hanya top-k hit, dimuat kalau ringkasan belum ada di memo
+    def top_texts():
+        ids = [h[0] for h in search(conn, q, SUMMARY_TOP_K)]
+        if not ids:
+            return []
+        rows = conn.execute(
+            f"SELECT content_text FROM articles WHERE id IN ({','.join('?' * len(ids))})",
+            ids
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    return ai_summary(q, top_texts, get_index(conn))
+
+
+def reader_page():
+    conn = get_db()
+    if "reader_page" not in st.session_state:
+        st.session_state.reader_page = 0
+        st.session_state.reader_q = ""
+
+    st.subheader("📖 Baca Artikel")
+
+    q = st.text_input("🔍 Cari artikel")
+
+    # query baru → kembali ke halaman pertama
+    if q != st.session_state.reader_q:
+        st.session_state.reader_q = q
+        st.session_state.reader_page = 0
+
+    page = st.session_state.reader_page
+    df, summary, has_more = search_articles(q, offset=page * SEARCH_TOP_K)
+
+    if summary:
+        st.info(f"🧠 Ringkasan AI:\n\n{summary}")
+
+    if df.empty:
+        st.info("Tidak ada artikel yang cocok" if q else "Belum ada artikel")
+
+    page_data = load_reader_data(
+        conn,
+        df["id"].tolist() if not df.empty else [],
+        st.session_state.user
+    )
+
+    for _, r in df.iterrows():
+
+        # ===== DROPDOWN ARTIKEL =====
+        with st.expander(
+            f"📘 {r['title']}  — ✍️ {r['author']} • {r['created_at']}",
+            expanded=False
+        ):
+
+            st.markdown("<div class='article-card'>", unsafe_allow_html=True)
+
+            # ===== CONTENT =====
+            show_content(r)
+
+            # ===== GRAFIK =====
+            if pd.notna(r.get("chart_config")) and r["chart_config"]:
+                cfg = json.loads(r["chart_config"])
+                if cfg and cfg.get("csv") and os.path.exists(cfg["csv"]):
+                    st.markdown("#### 📊 Grafik")
+
+                    # render hanya kalau pembaca memang membuka grafiknya
+                    if st.toggle("Tampilkan grafik", key=f"chart_{r['id']}"):
+                        st.image(render_chart(cfg))
+
+            # ===== ATTACHMENT =====
+            if pd.notna(r["attachment"]) and r["attachment"]:
+                show_attachment(conn, r["attachment"], key=f"att_{r['id']}", preview=False)
+
+            st.divider()
+
+            # ===== LIKE / SHARE / TRANSLATE / KOMENTAR =====
+            likes = page_data["likes"].get(r["id"], 0)
+            liked = r["id"] in page_data["liked"]
+
+            col1, col2, col3, col4 = st.columns(4)
+
+            # ❤️ LIKE
+            with col1:
+                if st.button(f"❤️ {likes}", key=f"like_{r['id']}"):
+                    if not liked:
+                        conn.execute(
+                            """
+                            INSERT INTO article_likes(article_id, username) VALUES (?,?)
+                            ON CONFLICT DO NOTHING
+                            """,
+                            (r["id"], st.session_state.user)
+                        )
+                        conn.commit()
+                        st.rerun()
+
+            # 💬 SHARE
+            with col2:
+                target = st.selectbox(
+                    "Kirim ke",
+                    page_data["users"],
+                    key=f"share_to_{r['id']}"
+                )
+
+                if st.button("💬 Share", key=f"share_{r['id']}"):
+                    msg = f"""📚 *{r['title']}*
+
+{r['snippet']}
+
+🔗 Dibagikan dari Knowledge Base
+"""
+                    conn.execute("""
+                        INSERT INTO chat
+                        (sender, receiver, message, created_at, is_read)
+                        VALUES (?, ?, ?, ?, 0)
+                    """, (
+                        st.session_state.user,
+                        target,
+                        msg,
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    ))
+                    conn.commit()
+                    on_chat_changed(st.session_state.user, target)
+                    st.success("✅ Artikel dibagikan")
+
+            # 🌐 TRANSLATE
+            with col3:
+                if st.button("🌐 Translate EN", key=f"tr_{r['id']}"):
+                    st.session_state[f"tr_open_{r['id']}"] = True
+
+            # 💬 KOMENTAR
+            with col4:
+                st.markdown("💬 Komentar")
+
+            if st.session_state.get(f"tr_open_{r['id']}"):
+                show_translation(r["id"], r["content_text"])
+
+            for c in page_data["comments"].get(r["id"], []):
+                st.markdown(
+                    f"<div class='comment-box'><b>{c['username']}</b><br>{c['comment']}</div>",
+                    unsafe_allow_html=True
+                )
+
+            comment = st.text_input(
+                "Tulis komentar",
+                key=f"c_{r['id']}"
+            )
+
+            if st.button("Kirim", key=f"send_c_{r['id']}"):
+                if comment:
+                    conn.execute("""
+                        INSERT INTO article_comments
+                        (article_id, username, comment, created_at)
+                        VALUES (?, ?, ?, ?)
+                    """, (
+                        r["id"],
+                        st.session_state.user,
+                        comment,
+                        datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                    ))
+                    conn.commit()
+                    st.rerun()
+
+            st.markdown("</div>", unsafe_allow_html=True)
+
+    # ===== PAGINATION =====
+    if page > 0 or has_more:
+        prev_col, page_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            if st.button("⬅️ Sebelumnya", disabled=page == 0):
+                st.session_state.reader_page -= 1
+                st.rerun()
+        with page_col:
+            st.markdown(f"Halaman {page + 1}")
+        with next_col:
+            if st.button("Berikutnya ➡️", disabled=not has_more):
+                st.session_state.reader_page += 1
+                st.rerun()
@@ -0,0 +1,90 @@
+import streamlit as st
+
+from auth import hash_pw
+from db import get_db
+from passwords import AuthBusy
+
+
+
+def user_management():
+    conn = get_db()
+    st.subheader("👥 User Management")
+
+    df = conn.read_df("SELECT id,username,role FROM users")
+    st.dataframe(df, width="stretch")
+
+    st.divider()
+    st.markdown("### ➕ Tambah User")
+
+    u = st.text_input("Username")
+    p = st.text_input("Password", type="password")
+    r = st.selectbox("Role", ["user","editor","admin"])
+
+    if st.button("Tambah User"):
+        try:
+            pw_hash = hash_pw(p, u)
+        except AuthBusy as e:
+            st.warning(f"Server sedang sibuk ({e}), coba lagi sebentar")
+            st.stop()
+        try:
+            conn.execute("""
+                INSERT INTO users(username,password,role,name,bio)
+                VALUES (?,?,?,?,?)
+            """, (u,pw_hash,r,u,""))
+            conn.commit()
+            st.success("User ditambahkan")
+            st.rerun()
+        except:
+            st.error("Username sudah ada")
+
+    st.divider()
+    st.markdown("### 🔐 Reset Password User (Admin Only)")
+
+    # 🔒 pastikan admin
+    if st.session_state.role != "admin":
+        st.info("Hanya admin yang bisa reset password user")
+        return
+
+    users = conn.read_df(
+        "SELECT username FROM users WHERE username != ?",
+        (st.session_state.user,)
+    )
+
+    target_user = st.selectbox(
+        "Pilih User",
+        users["username"].tolist()
+    )
+
+    new_pw = st.text_input(
+        "Password Baru",
+        type="password"
+    )
+
+    confirm_pw = st.text_input(
+        "Konfirmasi Password Baru",
+        type="password"
+    )
+
+    if st.button("🔁 Reset Password"):
+        if not new_pw or not confirm_pw:
+            st.error("Password tidak boleh kosong")
+            st.stop()
+
+        if new_pw != confirm_pw:
+            st.error("Password dan konfirmasi tidak sama")
+            st.stop()
+
+        try:
+            new_hash = hash_pw(new_pw, target_user)
+        except AuthBusy as e:
+            st.warning(f"Server sedang sibuk ({e}), coba lagi sebentar")
+            st.stop()
+
+        conn.execute(
+            "UPDATE users SET password=? WHERE username=?",
+            (new_hash, target_user)
+        )
+        conn.commit()
+
+        st.success(f"✅ Password user `{target_user}` berhasil di-reset")
+        st.toast("🔐 Password di-reset", icon="🛡️")